@@ -1,7 +1,7 @@
 """Common shared utilities for AI Engineer Portfolio."""
 
-from common.config import Settings
+from common.config import Settings, get_settings
 from common.logging import setup_logging
 from common.models import HealthResponse, ErrorResponse
 
-__all__ = ["Settings", "setup_logging", "HealthResponse", "ErrorResponse"]
+__all__ = ["Settings", "get_settings", "setup_logging", "HealthResponse", "ErrorResponse"]
@@ -7,12 +7,14 @@ gracefully and aggregating order confirmations.
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
+import logging
 from datetime import datetime, timezone
+from operator import attrgetter
+from typing import Any
 
 import structlog
 
-from ucp_shopping.config import Settings
+from ucp_shopping.config import Settings, get_settings
 from ucp_shopping.models import (
     MerchantInfo,
     OrderSummary,
@@ -24,13 +26,38 @@ from ucp_shopping.streaming import EVENT_CHECKOUT_PROGRESS, ShoppingEventStream
 
 logger = structlog.get_logger(__name__)
 
+_product_id = attrgetter("product_id")
+
+# Mock shipping details sent with every demo checkout.  Shared by reference,
+# so treat it as read-only.
+_DEMO_SHIPPING_PAYLOAD: dict[str, Any] = {
+    "shipping_address": {
+        "full_name": "Demo User",
+        "line1": "123 AI Street",
+        "city": "San Francisco",
+        "state": "CA",
+        "postal_code": "94105",
+        "country": "US",
+    },
+    "selected_shipping_id": "standard",
+}
+
 
 class CheckoutAgent:
     """Orchestrates checkouts across multiple merchants."""
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        client: UCPClient | None = None,
+    ) -> None:
+        settings = settings or get_settings()
         self._settings = settings
-        self._ucp_client = UCPClient(timeout=settings.checkout_timeout)
+        if client is None:
+            self._ucp_client = UCPClient(timeout=settings.checkout_timeout)
+        else:
+            self._ucp_client = client.with_timeout(settings.checkout_timeout)
+        self._http_slots = asyncio.Semaphore(settings.max_concurrent_http)
 
     async def execute_checkouts(
         self,
@@ -62,9 +89,13 @@ class CheckoutAgent:
             Completed orders.
         """
         # Group items by merchant
-        merchant_items: dict[str, list[SplitOrderItem]] = defaultdict(list)
+        merchant_items: dict[str, list[SplitOrderItem]] = {}
+        group = merchant_items.setdefault
         for item in plan.items:
-            merchant_items[item.merchant_id].append(item)
+            group(item.merchant_id, []).append(item)
+
+        # Orders placed in one fan-out share a creation timestamp
+        created_at = datetime.now(tz=timezone.utc)
 
         # Execute checkouts in parallel
         tasks: list[asyncio.Task[OrderSummary | None]] = []
@@ -81,18 +112,22 @@ class CheckoutAgent:
                 self._checkout_one_merchant(
                     merchant=merchant,
                     items=items,
+                    total=round(sum(i.total for i in items), 2),
+                    created_at=created_at,
                     stream=stream,
                     session_id=session_id,
                 )
             )
             tasks.append(task)
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
+        # Collect orders as each merchant finishes rather than waiting on
+        # the slowest one; per-merchant progress is already streamed.
         orders: list[OrderSummary] = []
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error("checkout_task_failed", error=str(result))
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                result = await next_done
+            except Exception as exc:
+                logger.error("checkout_task_failed", error=str(exc))
                 continue
             if result is not None:
                 orders.append(result)
@@ -108,6 +143,8 @@ class CheckoutAgent:
         self,
         merchant: MerchantInfo,
         items: list[SplitOrderItem],
+        total: float,
+        created_at: datetime,
         stream: ShoppingEventStream | None = None,
         session_id: str = "",
     ) -> OrderSummary | None:
@@ -119,133 +156,118 @@ class CheckoutAgent:
         3. Complete the checkout.
         4. Return an OrderSummary.
         """
-        merchant_url = merchant.url
-
-        try:
-            # 1. Create checkout session
-            line_items = [
-                {
-                    "product_id": item.product_id,
-                    "quantity": 1,
-                }
-                for item in items
-            ]
-
-            if stream:
-                await stream.emit(
-                    session_id,
-                    EVENT_CHECKOUT_PROGRESS,
-                    data={"merchant": merchant.name, "step": "creating_session"},
-                    message=f"Creating checkout at {merchant.name}...",
+        async with self._http_slots:
+            merchant_url = merchant.url
+
+            try:
+                # 1. Create checkout session
+                line_items = [
+                    {"product_id": pid, "quantity": 1} for pid in map(_product_id, items)
+                ]
+
+                if stream:
+                    stream.emit_buffered(
+                        session_id,
+                        EVENT_CHECKOUT_PROGRESS,
+                        data={"merchant": merchant.name, "step": "creating_session"},
+                        message=f"Creating checkout at {merchant.name}...",
+                    )
+
+                checkout = await self._ucp_client.create_checkout(
+                    merchant_url, line_items
                 )
-
-            checkout = await self._ucp_client.create_checkout(
-                merchant_url, line_items
-            )
-            checkout_session_id = checkout.get("id", "")
-
-            # 2. Update with shipping address (mock address for demo)
-            if stream:
-                await stream.emit(
-                    session_id,
-                    EVENT_CHECKOUT_PROGRESS,
-                    data={"merchant": merchant.name, "step": "updating_shipping"},
-                    message=f"Setting shipping details at {merchant.name}...",
+                checkout_session_id = checkout.get("id", "")
+
+                # 2. Update with shipping address (mock address for demo)
+                if stream:
+                    stream.emit_buffered(
+                        session_id,
+                        EVENT_CHECKOUT_PROGRESS,
+                        data={"merchant": merchant.name, "step": "updating_shipping"},
+                        message=f"Setting shipping details at {merchant.name}...",
+                    )
+
+                await self._ucp_client.update_checkout(
+                    merchant_url, checkout_session_id, _DEMO_SHIPPING_PAYLOAD
                 )
 
-            await self._ucp_client.update_checkout(
-                merchant_url,
-                checkout_session_id,
-                {
-                    "shipping_address": {
-                        "full_name": "Demo User",
-                        "line1": "123 AI Street",
-                        "city": "San Francisco",
-                        "state": "CA",
-                        "postal_code": "94105",
-                        "country": "US",
-                    },
-                    "selected_shipping_id": "standard",
-                },
-            )
-
-            # 3. Complete checkout
-            if stream:
-                await stream.emit(
-                    session_id,
-                    EVENT_CHECKOUT_PROGRESS,
-                    data={"merchant": merchant.name, "step": "completing"},
-                    message=f"Completing order at {merchant.name}...",
+                # 3. Complete checkout
+                if stream:
+                    stream.emit_buffered(
+                        session_id,
+                        EVENT_CHECKOUT_PROGRESS,
+                        data={"merchant": merchant.name, "step": "completing"},
+                        message=f"Completing order at {merchant.name}...",
+                    )
+
+                completion = await self._ucp_client.complete_checkout(
+                    merchant_url, checkout_session_id
                 )
 
-            completion = await self._ucp_client.complete_checkout(
-                merchant_url, checkout_session_id
-            )
-
-            order_id = completion.get("order_id", completion.get("id", checkout_session_id))
-            total = sum(i.total for i in items)
-
-            order = OrderSummary(
-                merchant_name=merchant.name,
-                merchant_id=merchant.id,
-                order_id=order_id,
-                items=items,
-                total=round(total, 2),
-                status="confirmed",
-                tracking_url=completion.get("tracking_url"),
-                created_at=datetime.now(tz=timezone.utc),
-            )
+                order_id = completion.get("order_id", completion.get("id", checkout_session_id))
 
-            if stream:
-                await stream.emit(
-                    session_id,
-                    EVENT_CHECKOUT_PROGRESS,
-                    data={
-                        "merchant": merchant.name,
-                        "step": "completed",
-                        "order_id": order_id,
-                    },
-                    message=f"Order {order_id} confirmed at {merchant.name}.",
+                order = OrderSummary(
+                    merchant_name=merchant.name,
+                    merchant_id=merchant.id,
+                    order_id=order_id,
+                    items=items,
+                    total=total,
+                    status="confirmed",
+                    tracking_url=completion.get("tracking_url"),
+                    created_at=created_at,
                 )
 
-            logger.info(
-                "merchant_checkout_complete",
-                merchant=merchant.name,
-                order_id=order_id,
-                total=total,
-            )
-            return order
-
-        except UCPClientError as exc:
-            logger.error(
-                "merchant_checkout_failed",
-                merchant=merchant.name,
-                error=str(exc),
-            )
-            if stream:
-                await stream.emit(
-                    session_id,
-                    EVENT_CHECKOUT_PROGRESS,
-                    data={"merchant": merchant.name, "step": "failed", "error": str(exc)},
-                    message=f"Checkout failed at {merchant.name}: {exc}",
+                if stream:
+                    await stream.emit(
+                        session_id,
+                        EVENT_CHECKOUT_PROGRESS,
+                        data={
+                            "merchant": merchant.name,
+                            "step": "completed",
+                            "order_id": order_id,
+                        },
+                        message=f"Order {order_id} confirmed at {merchant.name}.",
+                    )
+
+                if logger.is_enabled_for(logging.INFO):
+                    logger.info(
+                        "merchant_checkout_complete",
+                        merchant=merchant.name,
+                        order_id=order_id,
+                        total=total,
+                    )
+                return order
+
+            except UCPClientError as exc:
+                logger.error(
+                    "merchant_checkout_failed",
+                    merchant=merchant.name,
+                    error=str(exc),
                 )
-            return None
-
-        except Exception as exc:
-            logger.error(
-                "merchant_checkout_unexpected_error",
-                merchant=merchant.name,
-                error=str(exc),
-            )
-            if stream:
-                await stream.emit(
-                    session_id,
-                    EVENT_CHECKOUT_PROGRESS,
-                    data={"merchant": merchant.name, "step": "failed", "error": str(exc)},
-                    message=f"Checkout error at {merchant.name}: {exc}",
+                if stream:
+                    await stream.emit(
+                        session_id,
+                        EVENT_CHECKOUT_PROGRESS,
+                        data={"merchant": merchant.name, "step": "failed", "error": str(exc)},
+                        message=f"Checkout failed at {merchant.name}: {exc}",
+                    )
+                return None
+
+            except Exception as exc:
+                logger.error(
+                    "merchant_checkout_unexpected_error",
+                    merchant=merchant.name,
+                    error=str(exc),
                 )
-            return None
+                if stream:
+                    await stream.emit(
+                        session_id,
+                        EVENT_CHECKOUT_PROGRESS,
+                        data={"merchant": merchant.name, "step": "failed", "error": str(exc)},
+                        message=f"Checkout error at {merchant.name}: {exc}",
+                    )
+                return None
 
     async def close(self) -> None:
-        """Shut down the underlying HTTP client."""
+        """Shut down the HTTP client, unless it was injected by the caller."""
         await self._ucp_client.close()
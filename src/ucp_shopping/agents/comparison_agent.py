@@ -6,7 +6,10 @@ shipping cost, delivery speed, and stock availability.
 
 from __future__ import annotations
 
+import logging
+from collections.abc import Iterable
 from datetime import datetime, timezone
+from operator import attrgetter
 
 import structlog
 
@@ -24,6 +27,9 @@ _WEIGHT_SHIPPING = 0.25
 _WEIGHT_AVAILABILITY = 0.15
 _WEIGHT_DELIVERY = 0.10
 
+_TRIGRAM = 3  # n-gram length of the per-comparison keyword index
+_score = attrgetter("score")
+
 
 class ComparisonAgent:
     """Builds and scores a product comparison matrix."""
@@ -42,7 +48,8 @@ class ComparisonAgent:
         Parameters
         ----------
         search_results:
-            Mapping of merchant_id -> list of products.
+            Mapping of merchant_id -> list of products.  Left unchanged;
+            the entries hold scored copies.
         item_names:
             The item names from the shopping plan.
 
@@ -55,11 +62,15 @@ class ComparisonAgent:
         for products in search_results.values():
             all_products.extend(products)
 
+        texts, index = self._build_search_index(all_products)
+
         entries: list[ComparisonEntry] = []
 
         for item_name in item_names:
             # Find products that match this item name
-            matching = self._find_matching_products(all_products, item_name)
+            matching = self._find_matching_products(
+                all_products, texts, index, item_name
+            )
 
             if not matching:
                 entries.append(
@@ -70,23 +81,23 @@ class ComparisonAgent:
                 )
                 continue
 
-            # Score each product
-            scored = self._score_products(matching)
+            # Score each product, keeping its cheapest shipping cost
+            scored, shipping_by_id = self._score_products(matching)
 
             # Sort by score descending
-            scored.sort(key=lambda p: p.score, reverse=True)
-
-            # Find best price (lowest product price)
-            best_price = min(scored, key=lambda p: p.price) if scored else None
-
-            # Find best shipping (lowest cheapest shipping cost)
-            best_shipping = min(
-                scored,
-                key=lambda p: self._cheapest_shipping(p),
-            ) if scored else None
-
-            # Recommended is highest overall score
-            recommended = scored[0] if scored else None
+            scored.sort(key=_score, reverse=True)
+
+            # Recommended is highest overall score; best price and best
+            # shipping (lowest cheapest shipping cost) share a single pass
+            recommended = scored[0]
+            best_price = best_shipping = recommended
+            best_shipping_cost = shipping_by_id[id(recommended)]
+            for product in scored:
+                if product.price < best_price.price:
+                    best_price = product
+                shipping_cost = shipping_by_id[id(product)]
+                if shipping_cost < best_shipping_cost:
+                    best_shipping, best_shipping_cost = product, shipping_cost
 
             entries.append(
                 ComparisonEntry(
@@ -111,21 +122,45 @@ class ComparisonAgent:
             generated_at=datetime.now(tz=timezone.utc),
         )
 
-        logger.info(
-            "comparison_built",
-            items=len(entries),
-            total_products=total_products,
-            merchants=len(merchant_ids),
-        )
+        if logger.is_enabled_for(logging.INFO):
+            logger.info(
+                "comparison_built",
+                items=len(entries),
+                total_products=total_products,
+                merchants=len(merchant_ids),
+            )
         return matrix
 
     # ------------------------------------------------------------------
     # Matching
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _build_search_index(
+        products: list[ProductResult],
+    ) -> tuple[list[str], dict[str, set[int]]]:
+        """Build the lowercase search text and a trigram -> product index.
+
+        Returns the searchable text of each product (by position) and an
+        inverted index mapping every trigram of those texts to the
+        positions of the products that contain it.
+        """
+        texts: list[str] = []
+        index: dict[str, set[int]] = {}
+        for position, product in enumerate(products):
+            text = " ".join(
+                (product.name, product.description, product.category, product.brand)
+            ).lower()
+            texts.append(text)
+            for i in range(len(text) - _TRIGRAM + 1):
+                index.setdefault(text[i : i + _TRIGRAM], set()).add(position)
+        return texts, index
+
     @staticmethod
     def _find_matching_products(
         products: list[ProductResult],
+        texts: list[str],
+        index: dict[str, set[int]],
         item_name: str,
     ) -> list[ProductResult]:
         """Find products that match the item name using keyword overlap.
@@ -133,27 +168,42 @@ class ComparisonAgent:
         Uses a simple token-overlap heuristic: a product matches if at
         least one keyword from the item name appears in the product's
         name, description, or category.
+
+        A product can only contain a keyword if it contains every trigram
+        of it, so candidates come from intersecting the keyword's trigram
+        postings and only those texts are checked.  Keywords too short to
+        have a trigram fall back to scanning *texts*.
         """
         keywords = {w.lower() for w in item_name.split() if len(w) > 2}
         if not keywords:
             keywords = {item_name.lower()}
 
-        matching: list[ProductResult] = []
-        for product in products:
-            product_text = (
-                f"{product.name} {product.description} {product.category} {product.brand}"
-            ).lower()
-            overlap = sum(1 for kw in keywords if kw in product_text)
-            if overlap > 0:
-                matching.append(product)
+        matched: set[int] = set()
+        empty: set[int] = set()
+        for kw in keywords:
+            if len(kw) < _TRIGRAM:
+                candidates: Iterable[int] = range(len(texts))
+            else:
+                postings = sorted(
+                    (
+                        index.get(kw[i : i + _TRIGRAM], empty)
+                        for i in range(len(kw) - _TRIGRAM + 1)
+                    ),
+                    key=len,
+                )
+                candidates = postings[0].intersection(*postings[1:])
+            matched.update(i for i in candidates if kw in texts[i])
 
-        return matching
+        return [products[i] for i in sorted(matched)]
 
     # ------------------------------------------------------------------
     # Scoring
     # ------------------------------------------------------------------
 
-    def _score_products(self, products: list[ProductResult]) -> list[ProductResult]:
+    def _score_products(
+        self,
+        products: list[ProductResult],
+    ) -> tuple[list[ProductResult], dict[int, float]]:
         """Assign a composite score to each product.
 
         Score components:
@@ -161,31 +211,36 @@ class ComparisonAgent:
         - shipping_score:     lower cheapest shipping is better
         - availability_score: in-stock products score higher
         - delivery_score:     faster delivery is better
+
+        Scores go onto shallow copies, so the caller's products (shared
+        with graph state and the session snapshot) are never modified and a
+        product ranked for several items keeps a separate score per entry.
+
+        Returns the scored products together with their cheapest shipping
+        cost keyed by ``id()`` of each scored product, so callers can rank
+        on shipping without walking ``shipping_options`` again.
         """
         if not products:
-            return []
+            return [], {}
 
-        # Compute ranges for normalisation
+        # Gather each scoring column once
         prices = [p.price for p in products]
-        min_price = min(prices)
-        max_price = max(prices) if max(prices) != min_price else min_price + 1
-
-        shipping_costs = [self._cheapest_shipping(p) for p in products]
-        min_ship = min(shipping_costs)
-        max_ship = max(shipping_costs) if max(shipping_costs) != min_ship else min_ship + 1
-
+        shipping_costs = [p.cheapest_shipping_cost for p in products]
         delivery_days = [self._fastest_delivery(p) for p in products]
-        min_days = min(delivery_days)
-        max_days = max(delivery_days) if max(delivery_days) != min_days else min_days + 1
+
+        min_price, price_span = self._value_range(prices)
+        min_ship, ship_span = self._value_range(shipping_costs)
+        min_days, days_span = self._value_range(delivery_days)
 
         scored: list[ProductResult] = []
-        for product in products:
+        shipping_by_id: dict[int, float] = {}
+        for product, price, ship_cost, days in zip(
+            products, prices, shipping_costs, delivery_days
+        ):
             # Normalise to 0-1 (inverted: lower is better)
-            price_score = 1.0 - (product.price - min_price) / (max_price - min_price)
-            ship_cost = self._cheapest_shipping(product)
-            shipping_score = 1.0 - (ship_cost - min_ship) / (max_ship - min_ship)
-            days = self._fastest_delivery(product)
-            delivery_score = 1.0 - (days - min_days) / (max_days - min_days)
+            price_score = 1.0 - (price - min_price) / price_span
+            shipping_score = 1.0 - (ship_cost - min_ship) / ship_span
+            delivery_score = 1.0 - (days - min_days) / days_span
             availability_score = 1.0 if product.in_stock else 0.0
 
             composite = (
@@ -195,21 +250,21 @@ class ComparisonAgent:
                 + _WEIGHT_DELIVERY * delivery_score
             )
 
-            product_copy = product.model_copy(update={"score": round(composite, 4)})
-            scored.append(product_copy)
+            product = product.model_copy(update={"score": round(composite, 4)})
+            scored.append(product)
+            shipping_by_id[id(product)] = ship_cost
 
-        return scored
+        return scored, shipping_by_id
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _cheapest_shipping(product: ProductResult) -> float:
-        """Return the cheapest shipping cost for a product."""
-        if not product.shipping_options:
-            return 5.99  # default assumption
-        return min(so.price for so in product.shipping_options)
+    def _value_range(values: list[float]) -> tuple[float, float]:
+        """Return ``(minimum, span)`` for a column, using a span of 1 when flat."""
+        low = min(values)
+        return low, (max(values) - low) or 1
 
     @staticmethod
     def _fastest_delivery(product: ProductResult) -> int:
@@ -10,7 +10,7 @@ import asyncio
 
 import structlog
 
-from ucp_shopping.config import Settings
+from ucp_shopping.config import Settings, get_settings
 from ucp_shopping.models import MerchantInfo
 from ucp_shopping.protocols.ucp_client import UCPClient, UCPClientError
 
@@ -20,9 +20,18 @@ logger = structlog.get_logger(__name__)
 class DiscoveryAgent:
     """Discovers and validates UCP merchants."""
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        client: UCPClient | None = None,
+    ) -> None:
+        settings = settings or get_settings()
         self._settings = settings
-        self._ucp_client = UCPClient(timeout=settings.discovery_timeout)
+        if client is None:
+            self._ucp_client = UCPClient(timeout=settings.discovery_timeout)
+        else:
+            self._ucp_client = client.with_timeout(settings.discovery_timeout)
+        self._http_slots = asyncio.Semaphore(settings.max_concurrent_http)
 
     async def discover_merchants(
         self,
@@ -41,32 +50,7 @@ class DiscoveryAgent:
         list[MerchantInfo]
             Successfully discovered merchants, ranked by capability match.
         """
-        target_urls = urls or self._settings.known_merchant_urls
-        # Limit to configured max
-        target_urls = target_urls[: self._settings.max_merchants]
-
-        tasks = [self._discover_one(url) for url in target_urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        merchants: list[MerchantInfo] = []
-        for url, result in zip(target_urls, results):
-            if isinstance(result, MerchantInfo):
-                merchants.append(result)
-            else:
-                logger.warning(
-                    "merchant_discovery_failed",
-                    url=url,
-                    error=str(result),
-                )
-
-        # Rank by number of capabilities (more capable merchants first)
-        merchants.sort(key=lambda m: len(m.capabilities), reverse=True)
-
-        logger.info(
-            "merchants_discovered",
-            total=len(merchants),
-            names=[m.name for m in merchants],
-        )
+        merchants, _ = await self._discover_impl(urls)
         return merchants
 
     async def discover_merchants_with_failures(
@@ -80,15 +64,21 @@ class DiscoveryAgent:
         tuple[list[MerchantInfo], list[str]]
             A pair of (discovered_merchants, failed_urls).
         """
+        return await self._discover_impl(urls)
+
+    async def _discover_impl(
+        self,
+        urls: list[str] | None,
+    ) -> tuple[list[MerchantInfo], list[str]]:
+        """Probe the target URLs and split the outcome into merchants and failures."""
         target_urls = urls or self._settings.known_merchant_urls
+        # Limit to configured max
         target_urls = target_urls[: self._settings.max_merchants]
 
-        tasks = [self._discover_one(url) for url in target_urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await self._discover_all(target_urls)
 
         merchants: list[MerchantInfo] = []
         failed: list[str] = []
-
         for url, result in zip(target_urls, results):
             if isinstance(result, MerchantInfo):
                 merchants.append(result)
@@ -100,24 +90,45 @@ class DiscoveryAgent:
                     error=str(result),
                 )
 
+        # Rank by number of capabilities (more capable merchants first)
         merchants.sort(key=lambda m: len(m.capabilities), reverse=True)
+
+        logger.info(
+            "merchants_discovered",
+            total=len(merchants),
+            names=[m.name for m in merchants],
+        )
         return merchants, failed
 
+    async def _discover_all(self, urls: list[str]) -> list[MerchantInfo | UCPClientError]:
+        """Probe every URL concurrently, returning a result or error per URL."""
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self._try_discover_one(url)) for url in urls]
+        return [task.result() for task in tasks]
+
+    async def _try_discover_one(self, url: str) -> MerchantInfo | UCPClientError:
+        """Discover one merchant, returning the error instead of raising it."""
+        try:
+            return await self._discover_one(url)
+        except UCPClientError as exc:
+            return exc
+
     async def _discover_one(self, url: str) -> MerchantInfo:
         """Fetch and validate a single merchant manifest."""
-        try:
-            merchant = await self._ucp_client.discover(url)
-            # Validate minimum capabilities
-            if not merchant.id:
-                merchant.id = url.rstrip("/").split("/")[-1]
-            if not merchant.name:
-                merchant.name = merchant.id
-            return merchant
-        except UCPClientError:
-            raise
-        except Exception as exc:
-            raise UCPClientError(f"Unexpected error discovering {url}: {exc}") from exc
+        async with self._http_slots:
+            try:
+                merchant = await self._ucp_client.discover(url)
+                # Validate minimum capabilities
+                if not merchant.id:
+                    merchant.id = url.rstrip("/").split("/")[-1]
+                if not merchant.name:
+                    merchant.name = merchant.id
+                return merchant
+            except UCPClientError:
+                raise
+            except Exception as exc:
+                raise UCPClientError(f"Unexpected error discovering {url}: {exc}") from exc
 
     async def close(self) -> None:
-        """Shut down the underlying HTTP client."""
+        """Shut down the HTTP client, unless it was injected by the caller."""
         await self._ucp_client.close()
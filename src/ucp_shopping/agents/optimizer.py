@@ -7,7 +7,8 @@ cost (product price + shipping).
 
 from __future__ import annotations
 
-from collections import defaultdict
+from collections.abc import Callable
+from functools import lru_cache
 
 import structlog
 
@@ -21,6 +22,29 @@ from ucp_shopping.models import (
 
 logger = structlog.get_logger(__name__)
 
+# (price, cheapest shipping, product) for one merchant's offer on one item
+_Cost = tuple[float, float, ProductResult]
+# merchant_id -> product_query -> cheapest offer at that merchant
+_CostTable = dict[str, dict[str, _Cost]]
+
+_ProductFilter = Callable[[list[ProductResult]], list[ProductResult]]
+
+
+def _unfiltered(products: list[ProductResult]) -> list[ProductResult]:
+    """Preference filter used when no preferences are set."""
+    return products
+
+
+@lru_cache(maxsize=1024)
+def _merchant_url_from(product_url: str) -> str:
+    """Return the merchant base URL (everything before ``/api``) of a product URL.
+
+    The same products are planned repeatedly (re-optimisation, single-merchant
+    preference), so results are memoised.
+    """
+    base, sep, _ = product_url.rpartition("/api")
+    return base if sep else ""
+
 
 class SplitOrderOptimizer:
     """Computes optimal purchase plans across merchants."""
@@ -56,9 +80,9 @@ class SplitOrderOptimizer:
         prefs = preferences or ShoppingPreferences()
 
         if prefs.prefer_single_merchant:
-            return self._optimize_single_merchant(matrix, prefs)
+            return self._optimize_single_merchant(matrix, self._build_cost_table(matrix))
 
-        return self._optimize_split(matrix, prefs)
+        return self._optimize_split(matrix, self._make_preference_filter(prefs))
 
     # ------------------------------------------------------------------
     # Split-order optimisation
@@ -67,7 +91,7 @@ class SplitOrderOptimizer:
     def _optimize_split(
         self,
         matrix: ComparisonMatrix,
-        prefs: ShoppingPreferences,
+        preference_filter: _ProductFilter,
     ) -> SplitOrderPlan:
         """Pick the cheapest option per item regardless of merchant."""
         items: list[SplitOrderItem] = []
@@ -77,18 +101,16 @@ class SplitOrderOptimizer:
                 continue
 
             # Filter by preferences
-            candidates = self._apply_preference_filters(
-                entry.merchant_results, prefs
-            )
+            candidates = preference_filter(entry.merchant_results)
             if not candidates:
                 candidates = entry.merchant_results
 
-            # Find cheapest total (price + cheapest shipping)
-            best = min(
-                candidates,
-                key=lambda p: p.price + self._cheapest_shipping_cost(p),
-            )
-            shipping = self._cheapest_shipping_cost(best)
+            # Find cheapest total (price + cheapest shipping), computing each
+            # candidate's shipping cost once
+            shipping_costs = [p.cheapest_shipping_cost for p in candidates]
+            totals = [p.price + ship for p, ship in zip(candidates, shipping_costs)]
+            best_idx = min(range(len(totals)), key=totals.__getitem__)
+            best, shipping = candidates[best_idx], shipping_costs[best_idx]
 
             items.append(
                 SplitOrderItem(
@@ -110,13 +132,16 @@ class SplitOrderOptimizer:
         total_shipping = round(sum(i.shipping_cost for i in items), 2)
         grand_total = round(total_product + total_shipping, 2)
 
-        # Calculate savings vs single-merchant baseline
-        single_plan = self._optimize_single_merchant(matrix, prefs)
-        savings = round(max(0.0, single_plan.grand_total - grand_total), 2)
-
         # Count distinct merchants
         merchant_ids = {i.merchant_id for i in items}
 
+        # Calculate savings vs single-merchant baseline.  The baseline takes
+        # each merchant's lowest-priced product, so even a plan that stays with
+        # one merchant can save by picking a product with cheaper shipping.
+        cost_table = self._build_cost_table(matrix)
+        _, single_total = self._best_single_merchant(cost_table, len(matrix.entries))
+        savings = round(max(0.0, single_total - grand_total), 2)
+
         plan = SplitOrderPlan(
             items=items,
             total_product_cost=total_product,
@@ -143,74 +168,97 @@ class SplitOrderOptimizer:
     def _optimize_single_merchant(
         self,
         matrix: ComparisonMatrix,
-        prefs: ShoppingPreferences,
+        cost_table: _CostTable,
     ) -> SplitOrderPlan:
         """Find the best single merchant to fulfil all items."""
-        # Group available products by merchant
-        merchant_items: dict[str, list[tuple[str, ProductResult]]] = defaultdict(list)
+        best_row, _ = self._best_single_merchant(cost_table, len(matrix.entries))
+
+        if best_row is None:
+            # If no single merchant can fulfil all items, fall back to split
+            # but mark it as a single-merchant attempt
+            return SplitOrderPlan(
+                items=[],
+                reasoning="No single merchant can fulfil all items.",
+            )
 
-        for entry in matrix.entries:
-            for result in entry.merchant_results:
-                merchant_items[result.merchant_id].append(
-                    (entry.product_query, result)
-                )
+        items = [
+            SplitOrderItem(
+                product_name=product.name,
+                product_id=product.product_id,
+                merchant_name=product.merchant_name,
+                merchant_id=product.merchant_id,
+                merchant_url=self._get_merchant_url(product),
+                price=price,
+                shipping_cost=shipping,
+            )
+            for price, shipping, product in best_row.values()
+        ]
 
-        # Evaluate each merchant that can fulfil all items
-        num_items = len(matrix.entries)
-        best_plan: SplitOrderPlan | None = None
+        total_product = round(sum(i.price for i in items), 2)
+        total_shipping = round(sum(i.shipping_cost for i in items), 2)
+        return SplitOrderPlan(
+            items=items,
+            total_product_cost=total_product,
+            total_shipping_cost=total_shipping,
+            grand_total=round(total_product + total_shipping, 2),
+            savings_vs_single=0.0,
+            merchants_used=1,
+            reasoning=f"All items from {items[0].merchant_name}.",
+        )
 
-        for merchant_id, available in merchant_items.items():
-            # Pick cheapest option per item from this merchant
-            item_map: dict[str, ProductResult] = {}
-            for item_query, product in available:
-                if item_query not in item_map or product.price < item_map[item_query].price:
-                    item_map[item_query] = product
+    @staticmethod
+    def _best_single_merchant(
+        cost_table: _CostTable,
+        num_items: int,
+    ) -> tuple[dict[str, _Cost] | None, float]:
+        """Return the cheapest merchant row covering every item and its grand total.
+
+        The row is ``None`` (and the total ``0.0``) when no merchant can
+        fulfil all items.
+        """
+        best_row: dict[str, _Cost] | None = None
+        best_total = 0.0
 
+        for row in cost_table.values():
             # Only consider merchants that can cover all items
-            if len(item_map) < num_items:
+            if len(row) < num_items:
                 continue
 
-            items: list[SplitOrderItem] = []
-            for item_query, product in item_map.items():
-                shipping = self._cheapest_shipping_cost(product)
-                items.append(
-                    SplitOrderItem(
-                        product_name=product.name,
-                        product_id=product.product_id,
-                        merchant_name=product.merchant_name,
-                        merchant_id=product.merchant_id,
-                        merchant_url=self._get_merchant_url(product),
-                        price=product.price,
-                        shipping_cost=shipping,
-                    )
-                )
+            # Transpose the row into price / shipping columns and reduce each
+            prices, shipping_costs, _ = zip(*row.values())
+            total_product = round(sum(prices), 2)
 
-            total_product = round(sum(i.price for i in items), 2)
-            total_shipping = round(sum(i.shipping_cost for i in items), 2)
+            # Shipping is never negative, so the product subtotal alone is a
+            # lower bound: prune merchants that cannot beat the current best
+            if best_row is not None and total_product >= best_total:
+                continue
+
+            total_shipping = round(sum(shipping_costs), 2)
             grand_total = round(total_product + total_shipping, 2)
 
-            plan = SplitOrderPlan(
-                items=items,
-                total_product_cost=total_product,
-                total_shipping_cost=total_shipping,
-                grand_total=grand_total,
-                savings_vs_single=0.0,
-                merchants_used=1,
-                reasoning=f"All items from {items[0].merchant_name if items else 'unknown'}.",
-            )
+            if best_row is None or grand_total < best_total:
+                best_row, best_total = row, grand_total
 
-            if best_plan is None or grand_total < best_plan.grand_total:
-                best_plan = plan
+        return best_row, best_total
 
-        if best_plan is not None:
-            return best_plan
+    @staticmethod
+    def _build_cost_table(matrix: ComparisonMatrix) -> _CostTable:
+        """Index each merchant's cheapest product per item.
 
-        # If no single merchant can fulfil all items, fall back to split
-        # but mark it as a single-merchant attempt
-        return SplitOrderPlan(
-            items=[],
-            reasoning="No single merchant can fulfil all items.",
-        )
+        Returns ``{merchant_id: {product_query: (price, shipping, product)}}``
+        where *shipping* is the product's cheapest shipping cost.
+        """
+        table: _CostTable = {}
+
+        for entry in matrix.entries:
+            query = entry.product_query
+            for result in entry.merchant_results:
+                row = table.setdefault(result.merchant_id, {})
+                current = row.get(query)
+                if current is None or result.price < current[0]:
+                    row[query] = (result.price, result.cheapest_shipping_cost, result)
+
+        return table
 
     # ------------------------------------------------------------------
     # Free shipping threshold logic
@@ -225,99 +273,109 @@ class SplitOrderOptimizer:
 
         This is a simplified model: if the total from a merchant exceeds a
         known free-shipping threshold, all shipping from that merchant is
-        waived.
+        waived.  Items are updated in place and the same list is returned.
         """
         # Group items by merchant and compute subtotals
-        merchant_subtotals: dict[str, float] = defaultdict(float)
+        merchant_subtotals: dict[str, float] = {}
         for item in items:
-            merchant_subtotals[item.merchant_id] += item.price
+            merchant_id = item.merchant_id
+            merchant_subtotals[merchant_id] = merchant_subtotals.get(merchant_id, 0.0) + item.price
 
         # Check thresholds (stored in metadata on comparison results)
         # For now, use a heuristic: free shipping if subtotal >= 100
         free_shipping_threshold = 100.0
+        qualifying = {
+            merchant_id
+            for merchant_id, subtotal in merchant_subtotals.items()
+            if subtotal >= free_shipping_threshold
+        }
+        if not qualifying:
+            return items
 
-        updated: list[SplitOrderItem] = []
         for item in items:
-            if merchant_subtotals[item.merchant_id] >= free_shipping_threshold:
-                updated.append(
-                    item.model_copy(
-                        update={
-                            "shipping_cost": 0.0,
-                            "total": round(item.price, 2),
-                        }
-                    )
-                )
-            else:
-                updated.append(item)
+            if item.merchant_id in qualifying:
+                item.shipping_cost = 0.0
+                item.total = round(item.price, 2)
 
-        return updated
+        return items
 
     # ------------------------------------------------------------------
     # Preference filters
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _apply_preference_filters(
-        products: list[ProductResult],
-        prefs: ShoppingPreferences,
-    ) -> list[ProductResult]:
-        """Filter products based on user preferences."""
-        filtered = list(products)
+    def _make_preference_filter(prefs: ShoppingPreferences) -> _ProductFilter:
+        """Compile the active user preferences into a single product filter.
+
+        Preferences are inspected once; the returned function applies only
+        the filters that are set and is the identity when none are.
+        """
+        steps: list[_ProductFilter] = []
 
         # Filter by max shipping days
-        if prefs.max_shipping_days is not None:
-            filtered = [
-                p
-                for p in filtered
-                if any(
-                    so.estimated_days_max <= prefs.max_shipping_days
-                    for so in p.shipping_options
-                )
-                or not p.shipping_options
-            ]
+        max_days = prefs.max_shipping_days
+        if max_days is not None:
+
+            def within_max_days(products: list[ProductResult]) -> list[ProductResult]:
+                return [
+                    p
+                    for p in products
+                    if any(so.estimated_days_max <= max_days for so in p.shipping_options)
+                    or not p.shipping_options
+                ]
+
+            steps.append(within_max_days)
 
         # Filter by free shipping preference
         if prefs.prefer_free_shipping:
-            free_options = [
-                p
-                for p in filtered
-                if any(so.is_free or so.price == 0 for so in p.shipping_options)
-            ]
-            if free_options:
-                filtered = free_options
+
+            def free_shipping(products: list[ProductResult]) -> list[ProductResult]:
+                free_options = [
+                    p
+                    for p in products
+                    if any(so.is_free or so.price == 0 for so in p.shipping_options)
+                ]
+                return free_options or products
+
+            steps.append(free_shipping)
 
         # Filter by preferred brands
         if prefs.preferred_brands:
             brand_lower = {b.lower() for b in prefs.preferred_brands}
-            brand_matches = [
-                p for p in filtered if p.brand.lower() in brand_lower
-            ]
-            if brand_matches:
-                filtered = brand_matches
+
+            def preferred_brand(products: list[ProductResult]) -> list[ProductResult]:
+                brand_matches = [p for p in products if p.brand.lower() in brand_lower]
+                return brand_matches or products
+
+            steps.append(preferred_brand)
 
         # Filter by minimum rating
-        if prefs.min_rating is not None:
-            rated = [p for p in filtered if p.rating >= prefs.min_rating]
-            if rated:
-                filtered = rated
+        min_rating = prefs.min_rating
+        if min_rating is not None:
 
-        return filtered
+            def rated(products: list[ProductResult]) -> list[ProductResult]:
+                return [p for p in products if p.rating >= min_rating] or products
+
+            steps.append(rated)
+
+        if not steps:
+            return _unfiltered
+
+        def apply(products: list[ProductResult]) -> list[ProductResult]:
+            for step in steps:
+                products = step(products)
+            return products
+
+        return apply
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
-    @staticmethod
-    def _cheapest_shipping_cost(product: ProductResult) -> float:
-        """Return the cheapest shipping cost for a product."""
-        if not product.shipping_options:
-            return 5.99
-        return min(so.price for so in product.shipping_options)
-
     @staticmethod
     def _get_merchant_url(product: ProductResult) -> str:
         """Derive the merchant URL from product metadata."""
-        return product.url.rsplit("/api", 1)[0] if "/api" in product.url else ""
+        return _merchant_url_from(product.url)
 
     @staticmethod
     def _build_reasoning(items: list[SplitOrderItem], savings: float) -> str:
@@ -7,23 +7,36 @@ the results into a consistent format.
 from __future__ import annotations
 
 import asyncio
+import sys
 from typing import Any
 
 import structlog
 
-from ucp_shopping.config import Settings
+from ucp_shopping.config import Settings, get_settings
 from ucp_shopping.models import MerchantInfo, ProductResult
 from ucp_shopping.protocols.ucp_client import UCPClient, UCPClientError
 
 logger = structlog.get_logger(__name__)
 
+# Merchants advertising this capability accept several queries per request
+_BATCH_SEARCH_CAPABILITY = "catalog.search.batch"
+
 
 class SearchAgent:
     """Searches products across multiple UCP merchants in parallel."""
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        client: UCPClient | None = None,
+    ) -> None:
+        settings = settings or get_settings()
         self._settings = settings
-        self._ucp_client = UCPClient(timeout=settings.comparison_timeout)
+        if client is None:
+            self._ucp_client = UCPClient(timeout=settings.comparison_timeout)
+        else:
+            self._ucp_client = client.with_timeout(settings.comparison_timeout)
+        self._http_slots = asyncio.Semaphore(settings.max_concurrent_http)
 
     async def search_all_merchants(
         self,
@@ -53,6 +66,14 @@ class SearchAgent:
         tasks: list[asyncio.Task[tuple[str, list[ProductResult]]]] = []
 
         for merchant in merchants:
+            # One round trip per merchant when it supports multi-query search
+            if len(queries) > 1 and _BATCH_SEARCH_CAPABILITY in merchant.capabilities:
+                tasks.append(
+                    asyncio.create_task(
+                        self._search_merchant_batch(merchant, queries, filters)
+                    )
+                )
+                continue
             for query in queries:
                 task = asyncio.create_task(
                     self._search_one_merchant(merchant, query, filters)
@@ -61,22 +82,22 @@ class SearchAgent:
 
         results_tuples = await asyncio.gather(*tasks, return_exceptions=True)
 
-        # Aggregate results by merchant
+        # Aggregate results by merchant, dropping duplicate products (the
+        # same product often matches several queries) as they arrive
         merchant_results: dict[str, list[ProductResult]] = {}
+        seen_by_merchant: dict[str, set[tuple[str, str]]] = {}
         for result in results_tuples:
             if isinstance(result, Exception):
                 logger.warning("search_task_failed", error=str(result))
                 continue
             merchant_id, products = result
-            if merchant_id not in merchant_results:
-                merchant_results[merchant_id] = []
-            merchant_results[merchant_id].extend(products)
-
-        # Deduplicate within each merchant
-        for merchant_id in merchant_results:
-            merchant_results[merchant_id] = self._deduplicate(
-                merchant_results[merchant_id]
-            )
+            unique = merchant_results.setdefault(merchant_id, [])
+            seen = seen_by_merchant.setdefault(merchant_id, set())
+            for product in products:
+                key = (product.merchant_id, product.product_id)
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(product)
 
         logger.info(
             "search_complete",
@@ -99,19 +120,15 @@ class SearchAgent:
             The merchant ID and the list of matching products.
         """
         try:
-            products = await self._ucp_client.search_products(
-                merchant.url,
-                query,
-                filters=filters,
-                limit=self._settings.max_results_per_merchant,
-            )
+            async with self._http_slots:
+                products = await self._ucp_client.search_products(
+                    merchant.url,
+                    query,
+                    filters=filters,
+                    limit=self._settings.max_results_per_merchant,
+                )
 
-            # Ensure merchant info is populated on each result
-            for product in products:
-                if not product.merchant_id:
-                    product.merchant_id = merchant.id
-                if not product.merchant_name:
-                    product.merchant_name = merchant.name
+            self._attribute_to_merchant(products, merchant)
 
             logger.debug(
                 "merchant_search_complete",
@@ -130,18 +147,63 @@ class SearchAgent:
             )
             return merchant.id, []
 
+    async def _search_merchant_batch(
+        self,
+        merchant: MerchantInfo,
+        queries: list[str],
+        filters: dict[str, Any] | None = None,
+    ) -> tuple[str, list[ProductResult]]:
+        """Search a single merchant for all queries in one batch request.
+
+        Returns
+        -------
+        tuple[str, list[ProductResult]]
+            The merchant ID and the matching products, in query order.
+        """
+        try:
+            async with self._http_slots:
+                per_query = await self._ucp_client.search_products_batch(
+                    merchant.url,
+                    queries,
+                    filters=filters,
+                    limit=self._settings.max_results_per_merchant,
+                )
+        except UCPClientError as exc:
+            logger.warning(
+                "merchant_search_failed",
+                merchant=merchant.name,
+                queries=queries,
+                error=str(exc),
+            )
+            return merchant.id, []
+
+        products = [product for batch in per_query for product in batch]
+        self._attribute_to_merchant(products, merchant)
+
+        logger.debug(
+            "merchant_search_complete",
+            merchant=merchant.name,
+            queries=queries,
+            results=len(products),
+        )
+        return merchant.id, products
+
     @staticmethod
-    def _deduplicate(products: list[ProductResult]) -> list[ProductResult]:
-        """Remove duplicate products (by product_id) keeping the first occurrence."""
-        seen: set[str] = set()
-        unique: list[ProductResult] = []
+    def _attribute_to_merchant(
+        products: list[ProductResult],
+        merchant: MerchantInfo,
+    ) -> None:
+        """Ensure merchant info is populated on each result.
+
+        IDs are interned here, at ingress, because they key every dedup set
+        and optimizer table downstream.
+        """
         for product in products:
-            key = f"{product.merchant_id}:{product.product_id}"
-            if key not in seen:
-                seen.add(key)
-                unique.append(product)
-        return unique
+            product.merchant_id = sys.intern(product.merchant_id or merchant.id)
+            product.product_id = sys.intern(product.product_id)
+            if not product.merchant_name:
+                product.merchant_name = merchant.name
 
     async def close(self) -> None:
-        """Shut down the underlying HTTP client."""
+        """Shut down the HTTP client, unless it was injected by the caller."""
         await self._ucp_client.close()
@@ -12,10 +12,12 @@ Exposes REST endpoints for:
 from __future__ import annotations
 
 import asyncio
-import json
 import uuid
-from datetime import datetime, timezone
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
+from itertools import islice
 from typing import Any
 
 import structlog
@@ -23,7 +25,7 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from sse_starlette.sse import EventSourceResponse
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
 
 from common import ErrorResponse, HealthResponse
 
@@ -34,8 +36,10 @@ from ucp_shopping.agents.search_agent import SearchAgent
 from ucp_shopping.config import Settings
 from ucp_shopping.models import (
     ComparisonMatrix,
+    MCPToolResult,
     MerchantInfo,
     OrderSummary,
+    ProductResult,
     ShoppingPreferences,
     ShoppingRequest,
     ShoppingSession,
@@ -45,10 +49,24 @@ from ucp_shopping.models import (
 from ucp_shopping.orchestrator.graph import compile_shopping_graph
 from ucp_shopping.orchestrator.state import ShoppingGraphState
 from ucp_shopping.protocols.mcp_surface import MCPToolHandler, list_tools
+from ucp_shopping.protocols.ucp_client import UCPClient
+from ucp_shopping.session_store import (
+    InMemorySessionStore,
+    SessionStore,
+    create_session_store,
+)
 from ucp_shopping.streaming import ShoppingEventStream
 
 logger = structlog.get_logger(__name__)
 
+# Keep-alive comment interval, and headers that stop reverse proxies (nginx,
+# CDNs) from buffering the event stream
+_SSE_PING_SECONDS = 15
+_SSE_HEADERS = {"X-Accel-Buffering": "no", "Cache-Control": "no-cache"}
+
+# How often the background sweeper looks for expired sessions
+_SESSION_SWEEP_SECONDS = 60
+
 
 # ---------------------------------------------------------------------------
 # Request / response models
@@ -59,7 +77,8 @@ class ShopRequest(BaseModel):
     """Incoming shopping request."""
 
     query: str
-    budget: float | None = None
+    # Parsed from the JSON number straight to Decimal by pydantic-core
+    budget: Decimal | None = Field(default=None, ge=0)
     preferences: ShoppingPreferences = Field(default_factory=ShoppingPreferences)
 
 
@@ -88,53 +107,124 @@ class ToolExecuteRequest(BaseModel):
     arguments: dict[str, Any] = Field(default_factory=dict)
 
 
+class MerchantListResponse(BaseModel):
+    """Known merchants."""
+
+    merchants: list[MerchantInfo]
+    total: int
+
+
+class DiscoverResponse(BaseModel):
+    """Merchants found by a discovery run."""
+
+    discovered: int
+    merchants: list[MerchantInfo]
+
+
+class CatalogResponse(BaseModel):
+    """One page of a merchant's catalog."""
+
+    merchant_id: str
+    merchant_name: str
+    products: list[ProductResult]
+    total: int
+
+
+class OrderListResponse(BaseModel):
+    """Completed orders."""
+
+    orders: list[OrderSummary]
+    total: int
+
+
 # ---------------------------------------------------------------------------
-# Session manager (in-memory)
+# Session manager
 # ---------------------------------------------------------------------------
 
 
 class SessionManager:
-    """In-memory shopping session store."""
+    """Shopping session manager on top of a pluggable session store."""
 
-    def __init__(self) -> None:
-        self._sessions: dict[str, ShoppingSession] = {}
+    def __init__(self, store: SessionStore | None = None) -> None:
+        self._store = store or InMemorySessionStore()
+        # Graph tasks run on this worker's event loop, so they stay local
         self._graph_tasks: dict[str, asyncio.Task[Any]] = {}
 
     async def create_session(self, request: ShoppingRequest) -> ShoppingSession:
         """Create a new shopping session."""
         session_id = str(uuid.uuid4())
+        now = datetime.now(tz=timezone.utc)
         session = ShoppingSession(
             id=session_id,
             request=request,
             state=ShoppingSessionState.PLANNING,
-            created_at=datetime.now(tz=timezone.utc),
-            updated_at=datetime.now(tz=timezone.utc),
+            created_at=now,
+            updated_at=now,
         )
-        self._sessions[session_id] = session
+        await self._store.set(session)
         return session
 
-    def get_session(self, session_id: str) -> ShoppingSession | None:
+    async def get_session(self, session_id: str) -> ShoppingSession | None:
         """Retrieve a session by ID."""
-        return self._sessions.get(session_id)
+        return await self._store.get(session_id)
 
-    def update_session(
+    async def update_session(
         self,
         session_id: str,
         **kwargs: Any,
     ) -> ShoppingSession | None:
         """Update session fields."""
-        session = self._sessions.get(session_id)
+        session = await self._store.get(session_id)
         if session is None:
             return None
-        for key, value in kwargs.items():
-            if hasattr(session, key):
-                setattr(session, key, value)
-        session.updated_at = datetime.now(tz=timezone.utc)
+        # Unknown keys are ignored, as before; model_copy would otherwise
+        # attach them to the copy as stray attributes.
+        fields = ShoppingSession.model_fields
+        update = {key: value for key, value in kwargs.items() if key in fields}
+        update["updated_at"] = datetime.now(tz=timezone.utc)
+        session = session.model_copy(update=update)
+        await self._store.set(session)
         return session
 
-    def list_sessions(self) -> list[ShoppingSession]:
+    async def list_sessions(self) -> list[ShoppingSession]:
         """Return all sessions."""
-        return list(self._sessions.values())
+        return await self._store.scan()
+
+    async def evict_expired(self, ttl_seconds: int) -> list[str]:
+        """Drop sessions idle for longer than *ttl_seconds*.
+
+        Also cancels their graph tasks if still running.  Only needed for
+        stores without a native TTL; Redis expires sessions on its own.
+
+        Returns
+        -------
+        list[str]
+            IDs of the evicted sessions.
+        """
+        cutoff = datetime.now(tz=timezone.utc) - timedelta(seconds=ttl_seconds)
+        expired = [s.id for s in await self._store.scan() if s.updated_at < cutoff]
+        for session_id in expired:
+            await self._store.delete(session_id)
+            task = self._graph_tasks.pop(session_id, None)
+            if task is not None and not task.done():
+                task.cancel()
+        return expired
+
+    def track_graph_task(self, session_id: str, task: asyncio.Task[Any]) -> None:
+        """Remember *session_id*'s graph task until it finishes."""
+        self._graph_tasks[session_id] = task
+
+        def _forget(done: asyncio.Task[Any]) -> None:
+            if self._graph_tasks.get(session_id) is done:
+                del self._graph_tasks[session_id]
+
+        task.add_done_callback(_forget)
+
+    async def close(self) -> None:
+        """Cancel running graph tasks and release the underlying session store."""
+        for task in self._graph_tasks.values():
+            task.cancel()
+        await self._store.close()
 
 
 # ---------------------------------------------------------------------------
@@ -147,11 +237,101 @@ class AppState:
 
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
-        self.session_manager = SessionManager()
+        self.session_manager = SessionManager(create_session_store(settings))
         self.event_stream = ShoppingEventStream()
         self.merchants: dict[str, MerchantInfo] = {}
         self.orders: dict[str, OrderSummary] = {}
-        self.graph_confirmations: dict[str, asyncio.Event] = {}
+        # Sessions whose plan has been confirmed; graph runs wait on the
+        # shared condition instead of holding an Event each.
+        self.confirmed_sessions: set[str] = set()
+        self.confirm_cond = asyncio.Condition()
+        # One connection pool for every agent; closed on app shutdown.
+        self.ucp_client = UCPClient()
+        # Stateless between calls, so request handlers share one of each
+        self.discovery_agent = DiscoveryAgent(settings, self.ucp_client)
+        self.search_agent = SearchAgent(settings, self.ucp_client)
+        self.comparison_agent = ComparisonAgent()
+        self.optimizer = SplitOrderOptimizer()
+        # Graph nodes keep no per-session state (it all lives in the graph
+        # state dict), so every session runs on one compiled graph.
+        self.compiled_graph = compile_shopping_graph(
+            settings, self.event_stream, self.ucp_client
+        )
+        self._discovery_task: asyncio.Task[list[MerchantInfo]] | None = None
+        self._sweeper_task: asyncio.Task[None] | None = None
+
+    async def discover_known_merchants(self) -> list[MerchantInfo]:
+        """Discover the configured merchants and record them in ``merchants``.
+
+        Concurrent callers share one in-flight discovery instead of each
+        probing every merchant.
+        """
+        task = self._discovery_task
+        if task is None or task.done():
+            task = asyncio.create_task(self._discover_and_record())
+            self._discovery_task = task
+        # Shielded so one caller's cancellation does not abort the others
+        return await asyncio.shield(task)
+
+    async def _discover_and_record(self) -> list[MerchantInfo]:
+        merchants = await self.discovery_agent.discover_merchants()
+        for m in merchants:
+            self.merchants[m.id] = m
+        return merchants
+
+    def start_warmup(self) -> None:
+        """Kick off merchant discovery in the background.
+
+        The compiled graph is already built in ``__init__``; warming the
+        merchant cache means the first ``/compare`` or ``/shop`` request
+        joins (or skips) discovery instead of paying for it in full.
+        """
+        self._discovery_task = asyncio.create_task(self._discover_and_record())
+
+    async def sweep_expired(self) -> None:
+        """Evict expired sessions with their per-session state, and trim orders."""
+        expired: list[str] = []
+        # Redis sessions carry a native TTL, so only the memory store is scanned
+        if self.settings.session_backend == "memory":
+            expired = await self.session_manager.evict_expired(
+                self.settings.session_ttl_seconds
+            )
+        for session_id in expired:
+            self.confirmed_sessions.discard(session_id)
+            self.event_stream.clear(session_id)
+
+        # Orders are kept in insertion order, so the oldest go first
+        excess = len(self.orders) - self.settings.max_retained_orders
+        if excess > 0:
+            for order_id in list(islice(self.orders, excess)):
+                del self.orders[order_id]
+
+        if expired or excess > 0:
+            logger.info(
+                "session_sweep_complete",
+                sessions_evicted=len(expired),
+                orders_trimmed=max(excess, 0),
+            )
+
+    def start_session_sweeper(self) -> None:
+        """Run :meth:`sweep_expired` periodically until :meth:`close`."""
+        self._sweeper_task = asyncio.create_task(self._sweep_forever())
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(_SESSION_SWEEP_SECONDS)
+            try:
+                await self.sweep_expired()
+            except Exception:
+                logger.warning("session_sweep_failed", exc_info=True)
+
+    async def close(self) -> None:
+        """Stop background tasks and release connections and the session store."""
+        for task in (self._discovery_task, self._sweeper_task):
+            if task is not None and not task.done():
+                task.cancel()
+        await self.ucp_client.close()
+        await self.session_manager.close()
 
 
 # ---------------------------------------------------------------------------
@@ -162,6 +342,26 @@ class AppState:
 def create_app(settings: Settings | None = None) -> FastAPI:
     """Create and configure the FastAPI application."""
     settings = settings or Settings()
+    state = AppState(settings)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        # Eager tasks (Python 3.12+) run inline until their first suspension,
+        # so graph runs and fan-out tasks that finish synchronously never hit
+        # the scheduler.
+        loop = asyncio.get_running_loop()
+        previous_factory = loop.get_task_factory()
+        eager_factory = getattr(asyncio, "eager_task_factory", None)
+        if eager_factory is not None and previous_factory is None:
+            loop.set_task_factory(eager_factory)
+        try:
+            if settings.warm_on_startup:
+                state.start_warmup()
+            state.start_session_sweeper()
+            yield
+        finally:
+            loop.set_task_factory(previous_factory)
+            await state.close()
 
     app = FastAPI(
         title="UCP Shopping Agent",
@@ -172,19 +372,19 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         version=settings.service_version,
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # CORS
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["*"],
+        allow_origins=settings.cors_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
     )
 
     # Shared state
-    state = AppState(settings)
     app.state.app_state = state
     app.state.settings = settings
 
@@ -213,21 +413,17 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         Creates a session and kicks off the LangGraph workflow
         asynchronously.  Use the ``/stream`` endpoint to follow progress.
         """
-        budget = Decimal(str(req.budget)) if req.budget is not None else None
         shopping_req = ShoppingRequest(
             query=req.query,
-            budget=budget,
+            budget=req.budget,
             preferences=req.preferences,
         )
         session = await state.session_manager.create_session(shopping_req)
 
         # Run the graph asynchronously
-        confirmation_event = asyncio.Event()
-        state.graph_confirmations[session.id] = confirmation_event
-
         async def _run_graph() -> None:
             """Execute the shopping graph, pausing at confirmation gate."""
-            compiled = compile_shopping_graph(settings, state.event_stream)
+            compiled = state.compiled_graph
 
             initial: ShoppingGraphState = {
                 "request": shopping_req,
@@ -235,7 +431,9 @@ def create_app(settings: Settings | None = None) -> FastAPI:
                 "preferences": req.preferences,
                 "current_state": ShoppingSessionState.PLANNING,
                 "shopping_plan": None,
+                "search_queries": [],
                 "discovered_merchants": [],
+                "merchants_map": {},
                 "failed_merchants": [],
                 "search_results": {},
                 "merged_results": [],
@@ -253,7 +451,7 @@ def create_app(settings: Settings | None = None) -> FastAPI:
 
             # Persist intermediate state on the session
             current_state = result.get("current_state", ShoppingSessionState.FAILED)
-            state.session_manager.update_session(
+            await state.session_manager.update_session(
                 session.id,
                 state=current_state,
                 merchants=result.get("discovered_merchants", []),
@@ -271,7 +469,11 @@ def create_app(settings: Settings | None = None) -> FastAPI:
                 if settings.human_confirmation_required:
                     # Wait for user confirmation
                     logger.info("awaiting_confirmation", session_id=session.id)
-                    await confirmation_event.wait()
+                    async with state.confirm_cond:
+                        await state.confirm_cond.wait_for(
+                            lambda: session.id in state.confirmed_sessions
+                        )
+                    state.confirmed_sessions.discard(session.id)
                     logger.info("confirmation_received", session_id=session.id)
 
                 # Re-run with confirmation
@@ -283,7 +485,7 @@ def create_app(settings: Settings | None = None) -> FastAPI:
                     "current_state", ShoppingSessionState.COMPLETED
                 )
                 orders = result.get("completed_orders", [])
-                state.session_manager.update_session(
+                await state.session_manager.update_session(
                     session.id,
                     state=final_state,
                     orders=orders,
@@ -293,7 +495,7 @@ def create_app(settings: Settings | None = None) -> FastAPI:
                     state.orders[order.order_id] = order
 
         task = asyncio.create_task(_run_graph())
-        state.session_manager._graph_tasks[session.id] = task
+        state.session_manager.track_graph_task(session.id, task)
 
         return {
             "session_id": session.id,
@@ -303,33 +505,39 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         }
 
     @app.get("/api/v1/shop/{session_id}", tags=["shopping"])
-    async def get_shopping_session(session_id: str) -> dict[str, Any]:
+    async def get_shopping_session(session_id: str) -> ShoppingSession:
         """Get the current state of a shopping session."""
-        session = state.session_manager.get_session(session_id)
+        session = await state.session_manager.get_session(session_id)
         if session is None:
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
-        return session.model_dump()
+        return session
 
     @app.get("/api/v1/shop/{session_id}/stream", tags=["shopping"])
     async def stream_shopping_session(session_id: str) -> EventSourceResponse:
         """SSE stream of shopping workflow events."""
-        session = state.session_manager.get_session(session_id)
+        session = await state.session_manager.get_session(session_id)
         if session is None:
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
 
         async def event_generator():  # type: ignore[no-untyped-def]
-            async for event in state.event_stream.subscribe(session_id):
-                yield {
-                    "event": event.event_type,
-                    "data": json.dumps(event.model_dump(), default=str),
-                }
+            async for batch in state.event_stream.subscribe_batches(session_id):
+                # One write per burst; every event keeps its own SSE frame.
+                # Each event is encoded once and shared by all subscribers.
+                yield b"".join(
+                    ServerSentEvent(event=event.event_type, data=event.encoded()).encode()
+                    for event in batch
+                )
 
-        return EventSourceResponse(event_generator())
+        return EventSourceResponse(
+            event_generator(),
+            ping=_SSE_PING_SECONDS,
+            headers=_SSE_HEADERS,
+        )
 
     @app.post("/api/v1/shop/{session_id}/confirm", tags=["shopping"])
     async def confirm_shopping_session(session_id: str) -> dict[str, Any]:
         """Confirm the shopping plan and proceed to checkout."""
-        session = state.session_manager.get_session(session_id)
+        session = await state.session_manager.get_session(session_id)
         if session is None:
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
 
@@ -340,9 +548,9 @@ def create_app(settings: Settings | None = None) -> FastAPI:
             )
 
         # Signal the graph to continue
-        confirmation_event = state.graph_confirmations.get(session_id)
-        if confirmation_event:
-            confirmation_event.set()
+        async with state.confirm_cond:
+            state.confirmed_sessions.add(session_id)
+            state.confirm_cond.notify_all()
 
         return {
             "session_id": session_id,
@@ -353,7 +561,7 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     @app.post("/api/v1/shop/{session_id}/cancel", tags=["shopping"])
     async def cancel_shopping_session(session_id: str) -> dict[str, Any]:
         """Cancel a shopping session."""
-        session = state.session_manager.get_session(session_id)
+        session = await state.session_manager.get_session(session_id)
         if session is None:
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
 
@@ -361,8 +569,9 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         task = state.session_manager._graph_tasks.get(session_id)
         if task and not task.done():
             task.cancel()
+        state.confirmed_sessions.discard(session_id)
 
-        state.session_manager.update_session(
+        await state.session_manager.update_session(
             session_id,
             state=ShoppingSessionState.FAILED,
             error="Cancelled by user.",
@@ -380,25 +589,22 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     # -------------------------------------------------------------------
 
     @app.post("/api/v1/compare", tags=["comparison"])
-    async def compare_prices(req: CompareRequest) -> dict[str, Any]:
+    async def compare_prices(req: CompareRequest) -> ComparisonMatrix:
         """Compare prices for a product across all known merchants."""
-        discovery = DiscoveryAgent(settings)
-        merchants = await discovery.discover_merchants()
-
-        search_agent = SearchAgent(settings)
-        results = await search_agent.search_all_merchants(
+        merchants = await state.discover_known_merchants()
+        results = await state.search_agent.search_all_merchants(
             merchants, [req.product_query]
         )
+        matrix = await state.comparison_agent.build_comparison(
+            results, [req.product_query]
+        )
 
-        comparison = ComparisonAgent()
-        matrix = await comparison.build_comparison(results, [req.product_query])
-
-        return matrix.model_dump()
+        return matrix
 
     @app.post("/api/v1/optimize", tags=["comparison"])
-    async def optimize_order(req: OptimizeRequest) -> dict[str, Any]:
+    async def optimize_order(req: OptimizeRequest) -> SplitOrderPlan:
         """Run split-order optimization on an existing session's comparison."""
-        session = state.session_manager.get_session(req.session_id)
+        session = await state.session_manager.get_session(req.session_id)
         if session is None:
             raise HTTPException(status_code=404, detail="Session not found")
         if session.comparison is None:
@@ -406,54 +612,46 @@ def create_app(settings: Settings | None = None) -> FastAPI:
                 status_code=400, detail="No comparison matrix available for this session."
             )
 
-        optimizer = SplitOrderOptimizer()
-        plan = await optimizer.optimize(
+        plan = await state.optimizer.optimize(
             session.comparison, session.request.preferences
         )
-        state.session_manager.update_session(
+        await state.session_manager.update_session(
             req.session_id, optimization_plan=plan
         )
-        return plan.model_dump()
+        return plan
 
     # -------------------------------------------------------------------
     # Merchant endpoints
     # -------------------------------------------------------------------
 
     @app.get("/api/v1/merchants", tags=["merchants"])
-    async def list_merchants() -> dict[str, Any]:
+    async def list_merchants() -> MerchantListResponse:
         """List all known merchants."""
         # Do a fresh discovery if none are cached
         if not state.merchants:
-            discovery = DiscoveryAgent(settings)
-            merchants = await discovery.discover_merchants()
-            for m in merchants:
-                state.merchants[m.id] = m
+            await state.discover_known_merchants()
 
-        return {
-            "merchants": [m.model_dump() for m in state.merchants.values()],
-            "total": len(state.merchants),
-        }
+        return MerchantListResponse(
+            merchants=list(state.merchants.values()),
+            total=len(state.merchants),
+        )
 
     @app.post("/api/v1/merchants/discover", tags=["merchants"])
-    async def discover_merchants(req: DiscoverRequest) -> dict[str, Any]:
+    async def discover_merchants(req: DiscoverRequest) -> DiscoverResponse:
         """Discover new UCP merchants at the given URLs."""
-        discovery = DiscoveryAgent(settings)
-        merchants = await discovery.discover_merchants(req.urls)
+        merchants = await state.discovery_agent.discover_merchants(req.urls)
 
         for m in merchants:
             state.merchants[m.id] = m
 
-        return {
-            "discovered": len(merchants),
-            "merchants": [m.model_dump() for m in merchants],
-        }
+        return DiscoverResponse(discovered=len(merchants), merchants=merchants)
 
     @app.get("/api/v1/merchants/{merchant_id}/catalog", tags=["merchants"])
     async def browse_merchant_catalog(
         merchant_id: str,
         q: str = "",
         limit: int = 20,
-    ) -> dict[str, Any]:
+    ) -> CatalogResponse:
         """Browse a specific merchant's product catalog."""
         merchant = state.merchants.get(merchant_id)
         if merchant is None:
@@ -461,38 +659,37 @@ def create_app(settings: Settings | None = None) -> FastAPI:
                 status_code=404, detail=f"Merchant {merchant_id} not found"
             )
 
-        search_agent = SearchAgent(settings)
-        results = await search_agent.search_all_merchants(
+        results = await state.search_agent.search_all_merchants(
             [merchant], [q or ""], filters=None
         )
 
         products = results.get(merchant_id, [])
-        return {
-            "merchant_id": merchant_id,
-            "merchant_name": merchant.name,
-            "products": [p.model_dump() for p in products[:limit]],
-            "total": len(products),
-        }
+        return CatalogResponse(
+            merchant_id=merchant_id,
+            merchant_name=merchant.name,
+            products=products[:limit],
+            total=len(products),
+        )
 
     # -------------------------------------------------------------------
     # Order endpoints
     # -------------------------------------------------------------------
 
     @app.get("/api/v1/orders", tags=["orders"])
-    async def list_orders() -> dict[str, Any]:
+    async def list_orders() -> OrderListResponse:
         """List all completed orders."""
-        return {
-            "orders": [o.model_dump() for o in state.orders.values()],
-            "total": len(state.orders),
-        }
+        return OrderListResponse(
+            orders=list(state.orders.values()),
+            total=len(state.orders),
+        )
 
     @app.get("/api/v1/orders/{order_id}", tags=["orders"])
-    async def get_order(order_id: str) -> dict[str, Any]:
+    async def get_order(order_id: str) -> OrderSummary:
         """Get details of a specific order."""
         order = state.orders.get(order_id)
         if order is None:
             raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
-        return order.model_dump()
+        return order
 
     # -------------------------------------------------------------------
     # MCP tool endpoints
@@ -507,10 +704,9 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     @app.post("/api/v1/mcp/tools/{tool_name}/execute", tags=["mcp"])
     async def mcp_execute_tool(
         tool_name: str, req: ToolExecuteRequest
-    ) -> dict[str, Any]:
+    ) -> MCPToolResult:
         """Execute an MCP tool by name."""
-        result = await mcp_handler.execute(tool_name, req.arguments)
-        return result.model_dump()
+        return await mcp_handler.execute(tool_name, req.arguments)
 
     # -------------------------------------------------------------------
     # Error handlers
@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import Literal
+
 from common.config import Settings as BaseSettings
 
 
@@ -18,6 +21,9 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8020
 
+    # Browser origins allowed to call the API with credentials
+    cors_origins: list[str] = ["http://localhost:3000"]
+
     # LLM configuration
     default_model: str = "gpt-4o-mini"
 
@@ -28,20 +34,26 @@ class Settings(BaseSettings):
         "http://localhost:8020/merchants/megamart",
     ]
     max_merchants: int = 10
+    # Discover known merchants in the background as the app starts
+    warm_on_startup: bool = True
 
     # Timeouts and limits
     comparison_timeout: int = 30
     discovery_timeout: int = 10
     checkout_timeout: int = 60
     max_results_per_merchant: int = 20
+    max_concurrent_http: int = 10
 
     # Human-in-the-loop
     human_confirmation_required: bool = True
 
     # Session management
     session_ttl_seconds: int = 3600
+    session_backend: Literal["memory", "redis"] = "memory"
+    max_retained_orders: int = 1000
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Return a cached settings instance."""
     return Settings()
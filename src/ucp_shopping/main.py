@@ -60,14 +60,21 @@ def build_app(settings: Settings | None = None) -> object:
 
 
 def main() -> None:
-    """Launch the UCP Shopping Agent server."""
+    """Launch the UCP Shopping Agent server.
+
+    uvicorn is started from the ``build_app`` factory.  ``uvicorn[standard]``
+    ships uvloop and httptools, which uvicorn picks up automatically.
+
+    The server runs as a single process: graph runs, confirmation waits,
+    SSE event streams and the mounted mock merchants' checkouts all live in
+    process memory, even when sessions are stored in Redis.
+    """
     settings = get_settings()
     setup_logging(settings.log_level)
 
-    app = build_app(settings)
-
     uvicorn.run(
-        app,  # type: ignore[arg-type]
+        "ucp_shopping.main:build_app",
+        factory=True,
         host=settings.host,
         port=settings.port,
         log_level=settings.log_level.lower(),
@@ -8,21 +8,49 @@ application for demo and testing purposes.
 
 from __future__ import annotations
 
+import json
+import re
 import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from itertools import islice
 from typing import Any
 
-from fastapi import FastAPI, HTTPException, Query
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Query, Response
+from pydantic import BaseModel, Field, PrivateAttr
+from pydantic_core import to_json
 
 
 # ---------------------------------------------------------------------------
 # Request / response models (lightweight, internal to the mock)
 # ---------------------------------------------------------------------------
 
+_USD = "USD"
+
+# Checkout session and order states
+_STATE_INCOMPLETE = "incomplete"
+_STATE_READY = "ready_for_complete"
+_STATE_COMPLETED = "completed"
+_STATE_CONFIRMED = "confirmed"
+_COMPLETABLE_STATES = frozenset({_STATE_INCOMPLETE, _STATE_READY})
+
+
+class LineItemIn(BaseModel):
+    product_id: str
+    quantity: int = Field(1, ge=1)
+
 
 class CreateCheckoutRequest(BaseModel):
-    line_items: list[dict[str, Any]]
+    line_items: list[LineItemIn]
+
+
+class BatchSearchRequest(BaseModel):
+    queries: list[str]
+    category: str | None = None
+    min_price: float | None = None
+    max_price: float | None = None
+    limit: int = Field(20, ge=1, le=100)
 
 
 class UpdateCheckoutRequest(BaseModel):
@@ -32,6 +60,155 @@ class UpdateCheckoutRequest(BaseModel):
     discount_code: str | None = None
 
 
+# Checkout state is built by the mock itself from its own catalog; these
+# models give the responses a schema and a single-pass JSON encode.  The small
+# value types repeated within every session and order are slotted
+# dataclasses, which pydantic serializes the same way but which carry no
+# per-instance ``__dict__``.
+
+
+@dataclass(slots=True)
+class Money:
+    amount: float
+    currency: str = _USD
+
+
+@dataclass(slots=True)
+class CheckoutLineItem:
+    product_id: str
+    product_name: str
+    quantity: int
+    unit_price: Money
+    total_price: Money
+
+
+class CheckoutSession(BaseModel):
+    id: str
+    state: str
+    line_items: list[CheckoutLineItem]
+    subtotal: Money
+    tax: Money
+    shipping_cost: Money
+    discount_amount: Money
+    total: Money
+    shipping_address: dict[str, Any] | None = None
+    selected_shipping: dict[str, Any] | None = None
+    created_at: str
+    updated_at: str
+    order_id: str | None = None
+    completed_at: str | None = None
+
+    # Integer-cent amounts the Money fields are derived from
+    _subtotal_cents: int = PrivateAttr(0)
+    _shipping_cents: int = PrivateAttr(0)
+    _discount_cents: int = PrivateAttr(0)
+
+
+@dataclass(slots=True)
+class OrderEvent:
+    event_type: str
+    message: str
+    timestamp: str
+
+
+class Order(BaseModel):
+    id: str
+    checkout_session_id: str
+    state: str
+    line_items: list[CheckoutLineItem]
+    shipping_address: dict[str, Any] | None = None
+    subtotal: Money
+    tax: Money
+    shipping_cost: Money
+    total: Money
+    tracking_number: str
+    tracking_url: str
+    created_at: str
+    history: list[OrderEvent]
+
+
+# ---------------------------------------------------------------------------
+# Checkout pricing
+# ---------------------------------------------------------------------------
+
+_TAX_RATE_BP = 875  # 8.75% sales tax, in basis points
+_DEFAULT_SHIPPING_CENTS = 599
+
+
+def _cents(amount: float) -> int:
+    """Convert a dollar amount to integer cents."""
+    return round(amount * 100)
+
+
+def _money(amount: float) -> Money:
+    """Build a USD ``Money`` value from a dollar amount."""
+    return Money(amount, _USD)
+
+
+def _usd(cents: int) -> Money:
+    return _money(cents / 100)
+
+
+def _totals(subtotal: int, shipping: int, discount: int) -> dict[str, Money]:
+    """Build the checkout Money fields from integer-cent amounts.
+
+    Tax is rounded half-up to the cent and the total is the exact sum of
+    the displayed parts.
+    """
+    tax = (subtotal * _TAX_RATE_BP + 5_000) // 10_000
+    return {
+        "subtotal": _usd(subtotal),
+        "tax": _usd(tax),
+        "shipping_cost": _usd(shipping),
+        "discount_amount": _usd(discount),
+        "total": _usd(subtotal + tax + shipping - discount),
+    }
+
+
+def _recalc_totals(session: CheckoutSession) -> None:
+    """Derive the session's Money fields from its integer-cent amounts."""
+    totals = _totals(session._subtotal_cents, session._shipping_cents, session._discount_cents)
+    for field, value in totals.items():
+        setattr(session, field, value)
+
+
+_TRIGRAM = 3  # n-gram length of the catalog keyword index
+
+# The 15 mock ratings a product can get (3.5 to 4.9), indexed by id hash
+_MOCK_RATINGS = tuple(round(3.5 + i / 10, 1) for i in range(15))
+
+
+def _json_response(payload: Any) -> Response:
+    """Encode a trusted, mock-built payload straight to a JSON response.
+
+    Skips FastAPI's response-model validation for the hot read endpoints;
+    the payloads come from the mock's own catalog and orders.
+    """
+    return Response(content=to_json(payload), media_type="application/json")
+
+
+def _paginate(matches: Iterable[bytes], offset: int, limit: int) -> tuple[list[bytes], int]:
+    """Collect one page of *matches* in a single pass and count the rest.
+
+    Only the page is materialized; matches before and after it are counted
+    as they stream past.
+    """
+    it = iter(matches)
+    skipped = sum(1 for _ in islice(it, offset))
+    page = list(islice(it, limit))
+    return page, skipped + len(page) + sum(1 for _ in it)
+
+
+def _json_object(members: dict[str, bytes]) -> bytes:
+    """Assemble a JSON object from already-encoded member values."""
+    return b"{" + b",".join(b'"%s":%s' % (k.encode(), v) for k, v in members.items()) + b"}"
+
+
+def _json_array(items: list[bytes]) -> bytes:
+    """Assemble a JSON array from already-encoded items."""
+    return b"[" + b",".join(items) + b"]"
+
+
 # ---------------------------------------------------------------------------
 # Mock merchant mini-app
 # ---------------------------------------------------------------------------
@@ -121,16 +298,62 @@ class MockMerchantApp:
         ]
 
         # In-memory state
-        self._checkout_sessions: dict[str, dict[str, Any]] = {}
-        self._orders: dict[str, dict[str, Any]] = {}
+        self._checkout_sessions: dict[str, CheckoutSession] = {}
+        self._orders: dict[str, Order] = {}
+        self._orders_list: list[Order] = []  # insertion order, for paging
 
-        # Enrich products with merchant info and shipping
+        # Enrich products with merchant info.  Shipping options are the same
+        # for every product, so they are sent once per response instead.
         for product in self.products:
             product.setdefault("merchant_id", self.merchant_id)
             product.setdefault("merchant_name", self.name)
-            product.setdefault("shipping_options", self.shipping_options)
             product.setdefault("in_stock", product.get("stock", 0) > 0)
-            product.setdefault("rating", round(3.5 + (hash(product.get("id", "")) % 15) / 10, 1))
+            if "rating" not in product:
+                product["rating"] = _MOCK_RATINGS[hash(product.get("id", "")) % 15]
+
+        # Lower-cased search text and category per product, built once so
+        # searches only scan them, plus the product's encoded JSON so search
+        # responses splice bytes instead of re-serializing.  Kept out of the
+        # product dicts so they never show up in responses.
+        self._search_index: list[tuple[dict[str, Any], str, str, bytes]] = [
+            (
+                product,
+                (
+                    f"{product['name']} {product.get('description', '')} "
+                    f"{product.get('category', '')} {product.get('brand', '')}"
+                ).lower(),
+                product.get("category", "").lower(),
+                to_json(product),
+            )
+            for product in self.products
+        ]
+        self._shipping_json = to_json(self.shipping_options)
+
+        # Trigram -> positions in ``_search_index`` whose text contains it.
+        # Narrows keyword searches to candidate products; the regex still
+        # confirms each match, so results are exactly the substring scan's.
+        trigrams: dict[str, set[int]] = {}
+        for pos, entry in enumerate(self._search_index):
+            text = entry[1]
+            for i in range(len(text) - _TRIGRAM + 1):
+                trigrams.setdefault(text[i : i + _TRIGRAM], set()).add(pos)
+        self._trigram_index: dict[str, frozenset[int]] = {
+            gram: frozenset(positions) for gram, positions in trigrams.items()
+        }
+
+        # O(1) lookups by ID; reversed so the first catalog entry wins on
+        # duplicate IDs, as the old linear scans did
+        self._products_by_id: dict[str, dict[str, Any]] = {
+            p["id"]: p for p in reversed(self.products)
+        }
+        self._shipping_by_id: dict[str, dict[str, Any]] = {
+            o["id"]: o for o in reversed(self.shipping_options)
+        }
+
+        # The manifest never changes, so serve pre-encoded JSON
+        self._manifest_json = json.dumps(
+            self._build_manifest(), separators=(",", ":")
+        ).encode()
 
         self.app = self._build_app()
 
@@ -141,322 +364,441 @@ class MockMerchantApp:
     def _build_app(self) -> FastAPI:
         """Construct the FastAPI sub-app with all UCP endpoints."""
         app = FastAPI(title=f"Mock Merchant: {self.name}")
-
-        merchant = self  # capture for closures
+        route = app.add_api_route
 
         # -- Discovery -------------------------------------------------
-
-        @app.get("/.well-known/ucp")
-        async def ucp_manifest() -> dict[str, Any]:
-            """Serve the UCP discovery manifest."""
-            return {
-                "spec_version": "0.1.0",
-                "merchant_name": merchant.name,
-                "merchant_domain": f"{merchant.merchant_id}.example.com",
-                "merchant_id": merchant.merchant_id,
-                "base_url": merchant.base_path,
-                "capabilities": [
-                    {
-                        "id": "catalog.search",
-                        "version": "1.0",
-                        "description": "Full-text product search",
-                    },
-                    {
-                        "id": "catalog.browse",
-                        "version": "1.0",
-                        "description": "Browse product catalog",
-                    },
-                    {
-                        "id": "checkout",
-                        "version": "1.0",
-                        "description": "Checkout session management",
-                    },
-                    {
-                        "id": "orders",
-                        "version": "1.0",
-                        "description": "Order tracking",
-                    },
-                ],
-                "extensions": [
-                    {
-                        "id": "discounts",
-                        "version": "1.0",
-                        "description": "Discount code support",
-                    },
-                    {
-                        "id": "fulfillment",
-                        "version": "1.0",
-                        "description": "Multiple shipping options",
-                    },
-                ],
-                "payment_handlers": [
-                    {
-                        "id": "mock_payment",
-                        "name": "Mock Payment",
-                        "description": "Simulated payment for demo",
-                        "handler_url": f"{merchant.base_path}/api/v1/payments",
-                        "supported_currencies": ["USD"],
-                    },
-                ],
-                "endpoints": {
-                    "catalog": f"{merchant.base_path}/api/v1/catalog/products",
-                    "checkout": f"{merchant.base_path}/api/v1/checkout/sessions",
-                    "orders": f"{merchant.base_path}/api/v1/orders",
-                    "negotiate": f"{merchant.base_path}/api/v1/negotiate",
-                },
-                "metadata": {
-                    "free_shipping_threshold": merchant.free_shipping_threshold,
-                    "currency": "USD",
-                    "return_policy": "30-day returns",
-                },
-            }
+        route("/.well-known/ucp", self.ucp_manifest, methods=["GET"])
 
         # -- Negotiation -----------------------------------------------
-
-        @app.post("/api/v1/negotiate")
-        async def negotiate(body: dict[str, Any]) -> dict[str, Any]:
-            """Simplified capability negotiation."""
-            return {
-                "negotiation_id": str(uuid.uuid4()),
-                "agent_id": body.get("agent_id", ""),
-                "agreed_capabilities": [
-                    {"id": "catalog.search", "version": "1.0"},
-                    {"id": "checkout", "version": "1.0"},
-                ],
-                "agreed_extensions": [
-                    {"id": "discounts", "version": "1.0"},
-                ],
-                "agreed_payment_handlers": [
-                    {"id": "mock_payment", "name": "Mock Payment"},
-                ],
-                "session_endpoint": f"{merchant.base_path}/api/v1/checkout/sessions",
-            }
+        route("/api/v1/negotiate", self.negotiate, methods=["POST"])
 
         # -- Catalog ---------------------------------------------------
+        route("/api/v1/catalog/products", self.search_products, methods=["GET"])
+        route("/api/v1/catalog/search", self.batch_search_products, methods=["POST"])
+        route("/api/v1/catalog/products/{product_id}", self.get_product, methods=["GET"])
 
-        @app.get("/api/v1/catalog/products")
-        async def search_products(
-            q: str = Query("", description="Search query"),
-            category: str | None = Query(None),
-            min_price: float | None = Query(None),
-            max_price: float | None = Query(None),
-            limit: int = Query(20, ge=1, le=100),
-            offset: int = Query(0, ge=0),
-        ) -> dict[str, Any]:
-            """Search the product catalog."""
-            results = list(merchant.products)
-
-            # Full-text search (simple keyword matching)
-            if q:
-                keywords = q.lower().split()
-                filtered = []
-                for product in results:
-                    text = (
-                        f"{product['name']} {product.get('description', '')} "
-                        f"{product.get('category', '')} {product.get('brand', '')}"
-                    ).lower()
-                    if any(kw in text for kw in keywords):
-                        filtered.append(product)
-                results = filtered
-
-            # Category filter
-            if category:
-                results = [
-                    p for p in results if p.get("category", "").lower() == category.lower()
-                ]
-
-            # Price range filters
-            if min_price is not None:
-                results = [p for p in results if p.get("price", 0) >= min_price]
-            if max_price is not None:
-                results = [p for p in results if p.get("price", 0) <= max_price]
-
-            total = len(results)
-            page = results[offset : offset + limit]
-
-            return {
-                "products": page,
-                "total": total,
-                "offset": offset,
-                "limit": limit,
-                "query": q or None,
-            }
+        # -- Checkout --------------------------------------------------
+        route(
+            "/api/v1/checkout/sessions",
+            self.create_checkout,
+            methods=["POST"],
+            response_model_exclude_unset=True,
+        )
+        route(
+            "/api/v1/checkout/sessions/{session_id}",
+            self.update_checkout,
+            methods=["PUT"],
+            response_model_exclude_unset=True,
+        )
+        route(
+            "/api/v1/checkout/sessions/{session_id}/complete",
+            self.complete_checkout,
+            methods=["POST"],
+        )
 
-        @app.get("/api/v1/catalog/products/{product_id}")
-        async def get_product(product_id: str) -> dict[str, Any]:
-            """Retrieve a single product by ID."""
-            for product in merchant.products:
-                if product["id"] == product_id:
-                    return product
-            raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
+        # -- Orders ----------------------------------------------------
+        route("/api/v1/orders/{order_id}", self.get_order, methods=["GET"])
+        route("/api/v1/orders", self.list_orders, methods=["GET"])
 
-        # -- Checkout --------------------------------------------------
+        return app
 
-        @app.post("/api/v1/checkout/sessions")
-        async def create_checkout(req: CreateCheckoutRequest) -> dict[str, Any]:
-            """Create a new checkout session."""
-            session_id = str(uuid.uuid4())
-
-            # Resolve line items
-            line_items = []
-            subtotal = 0.0
-            for item_req in req.line_items:
-                product_id = item_req.get("product_id", "")
-                quantity = item_req.get("quantity", 1)
-                product = None
-                for p in merchant.products:
-                    if p["id"] == product_id:
-                        product = p
-                        break
-                if product is None:
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"Product {product_id} not found",
-                    )
-                price = product["price"]
-                line_total = round(price * quantity, 2)
-                subtotal += line_total
-                line_items.append(
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+
+    # -- Discovery -----------------------------------------------------
+
+    async def ucp_manifest(self) -> Response:
+        """Serve the UCP discovery manifest."""
+        return Response(content=self._manifest_json, media_type="application/json")
+
+    # -- Negotiation ---------------------------------------------------
+
+    async def negotiate(self, body: dict[str, Any]) -> dict[str, Any]:
+        """Simplified capability negotiation."""
+        return {
+            "negotiation_id": str(uuid.uuid4()),
+            "agent_id": body.get("agent_id", ""),
+            "agreed_capabilities": [
+                {"id": "catalog.search", "version": "1.0"},
+                {"id": "checkout", "version": "1.0"},
+            ],
+            "agreed_extensions": [
+                {"id": "discounts", "version": "1.0"},
+            ],
+            "agreed_payment_handlers": [
+                {"id": "mock_payment", "name": "Mock Payment"},
+            ],
+            "session_endpoint": f"{self.base_path}/api/v1/checkout/sessions",
+        }
+
+    # -- Catalog -------------------------------------------------------
+    #
+    # Catalog scans and order listings are plain ``def`` handlers so FastAPI
+    # runs them (and their response serialization) in its threadpool instead
+    # of blocking the event loop.  O(1) lookups stay ``async def``: a thread
+    # hop would cost more than the lookup.
+
+    def search_products(
+        self,
+        q: str = Query("", description="Search query"),
+        category: str | None = Query(None),
+        min_price: float | None = Query(None),
+        max_price: float | None = Query(None),
+        limit: int = Query(20, ge=1, le=100),
+        offset: int = Query(0, ge=0),
+    ) -> Response:
+        """Search the product catalog."""
+        page, total = _paginate(
+            self._search_catalog(q, category, min_price, max_price),
+            offset,
+            limit,
+        )
+
+        body = _json_object(
+            {
+                "products": _json_array(page),
+                "total": to_json(total),
+                "offset": to_json(offset),
+                "limit": to_json(limit),
+                "query": to_json(q or None),
+                "shipping_options": self._shipping_json,
+            }
+        )
+        return Response(content=body, media_type="application/json")
+
+    def batch_search_products(self, req: BatchSearchRequest) -> Response:
+        """Run several catalog searches in one request."""
+        results: list[bytes] = []
+        for q in req.queries:
+            page, total = _paginate(
+                self._search_catalog(
+                    q, req.category, req.min_price, req.max_price
+                ),
+                0,
+                req.limit,
+            )
+            results.append(
+                _json_object(
                     {
-                        "product_id": product_id,
-                        "product_name": product["name"],
-                        "quantity": quantity,
-                        "unit_price": {"amount": price, "currency": "USD"},
-                        "total_price": {"amount": line_total, "currency": "USD"},
+                        "query": to_json(q or None),
+                        "products": _json_array(page),
+                        "total": to_json(total),
                     }
                 )
-
-            session = {
-                "id": session_id,
-                "state": "incomplete",
-                "line_items": line_items,
-                "subtotal": {"amount": round(subtotal, 2), "currency": "USD"},
-                "tax": {"amount": round(subtotal * 0.0875, 2), "currency": "USD"},
-                "shipping_cost": {"amount": 5.99, "currency": "USD"},
-                "discount_amount": {"amount": 0.0, "currency": "USD"},
-                "total": {
-                    "amount": round(subtotal + subtotal * 0.0875 + 5.99, 2),
-                    "currency": "USD",
-                },
-                "shipping_address": None,
-                "selected_shipping": None,
-                "created_at": datetime.now(tz=timezone.utc).isoformat(),
-                "updated_at": datetime.now(tz=timezone.utc).isoformat(),
-            }
-            merchant._checkout_sessions[session_id] = session
-            return session
-
-        @app.put("/api/v1/checkout/sessions/{session_id}")
-        async def update_checkout(
-            session_id: str, req: UpdateCheckoutRequest
-        ) -> dict[str, Any]:
-            """Update an existing checkout session."""
-            session = merchant._checkout_sessions.get(session_id)
-            if session is None:
-                raise HTTPException(status_code=404, detail="Checkout session not found")
-
-            if req.shipping_address:
-                session["shipping_address"] = req.shipping_address
-
-            if req.selected_shipping_id:
-                for opt in merchant.shipping_options:
-                    if opt["id"] == req.selected_shipping_id:
-                        session["selected_shipping"] = opt
-                        session["shipping_cost"] = {
-                            "amount": opt["price"],
-                            "currency": "USD",
-                        }
-                        break
-
-            # Check free shipping threshold
-            subtotal = session["subtotal"]["amount"]
-            if subtotal >= merchant.free_shipping_threshold:
-                session["shipping_cost"] = {"amount": 0.0, "currency": "USD"}
-
-            # Recalculate total
-            tax = session["tax"]["amount"]
-            shipping = session["shipping_cost"]["amount"]
-            discount = session["discount_amount"]["amount"]
-            session["total"] = {
-                "amount": round(subtotal + tax + shipping - discount, 2),
-                "currency": "USD",
+            )
+        body = _json_object(
+            {
+                "results": _json_array(results),
+                "limit": to_json(req.limit),
+                "shipping_options": self._shipping_json,
             }
+        )
+        return Response(content=body, media_type="application/json")
 
-            # Advance state if we have enough info
-            if session["shipping_address"] and session["state"] == "incomplete":
-                session["state"] = "ready_for_complete"
-
-            session["updated_at"] = datetime.now(tz=timezone.utc).isoformat()
-            return session
-
-        @app.post("/api/v1/checkout/sessions/{session_id}/complete")
-        async def complete_checkout(session_id: str) -> dict[str, Any]:
-            """Complete a checkout session and create an order."""
-            session = merchant._checkout_sessions.get(session_id)
-            if session is None:
-                raise HTTPException(status_code=404, detail="Checkout session not found")
-
-            if session["state"] not in ("ready_for_complete", "incomplete"):
+    async def get_product(self, product_id: str) -> dict[str, Any]:
+        """Retrieve a single product by ID."""
+        product = self._products_by_id.get(product_id)
+        if product is None:
+            raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
+        if "shipping_options" in product:
+            return product
+        return {**product, "shipping_options": self.shipping_options}
+
+    # -- Checkout ------------------------------------------------------
+
+    async def create_checkout(self, req: CreateCheckoutRequest) -> CheckoutSession:
+        """Create a new checkout session."""
+        session_id = str(uuid.uuid4())
+        now_iso = datetime.now(tz=timezone.utc).isoformat()
+
+        # Resolve line items
+        line_items = []
+        subtotal_cents = 0
+        for item_req in req.line_items:
+            product_id = item_req.product_id
+            quantity = item_req.quantity
+            product = self._products_by_id.get(product_id)
+            if product is None:
                 raise HTTPException(
-                    status_code=400,
-                    detail=f"Cannot complete session in state: {session['state']}",
+                    status_code=404,
+                    detail=f"Product {product_id} not found",
                 )
-
-            # Create order
-            order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
-            order = {
-                "id": order_id,
-                "checkout_session_id": session_id,
-                "state": "confirmed",
-                "line_items": session["line_items"],
-                "shipping_address": session.get("shipping_address"),
-                "subtotal": session["subtotal"],
-                "tax": session["tax"],
-                "shipping_cost": session["shipping_cost"],
-                "total": session["total"],
-                "tracking_number": f"TRK{uuid.uuid4().hex[:10].upper()}",
-                "tracking_url": f"https://tracking.example.com/TRK{uuid.uuid4().hex[:10].upper()}",
-                "created_at": datetime.now(tz=timezone.utc).isoformat(),
-                "history": [
-                    {
-                        "event_type": "order_confirmed",
-                        "message": "Order has been confirmed and is being processed.",
-                        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
-                    }
-                ],
+            price = product["price"]
+            line_cents = _cents(price) * quantity
+            subtotal_cents += line_cents
+            line_items.append(
+                CheckoutLineItem(
+                    product_id=product_id,
+                    product_name=product["name"],
+                    quantity=quantity,
+                    unit_price=_money(price),
+                    total_price=_usd(line_cents),
+                )
+            )
+
+        # order_id/completed_at stay unset, so the response omits them
+        # until the session is completed
+        session = CheckoutSession(
+            id=session_id,
+            state=_STATE_INCOMPLETE,
+            line_items=line_items,
+            shipping_address=None,
+            selected_shipping=None,
+            created_at=now_iso,
+            updated_at=now_iso,
+            **_totals(subtotal_cents, _DEFAULT_SHIPPING_CENTS, 0),
+        )
+        session._subtotal_cents = subtotal_cents
+        session._shipping_cents = _DEFAULT_SHIPPING_CENTS
+        self._checkout_sessions[session_id] = session
+        return session
+
+    async def update_checkout(
+        self,
+        session_id: str, req: UpdateCheckoutRequest
+    ) -> CheckoutSession:
+        """Update an existing checkout session."""
+        session = self._checkout_sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Checkout session not found")
+
+        if req.shipping_address:
+            session.shipping_address = req.shipping_address
+
+        if req.selected_shipping_id:
+            opt = self._shipping_by_id.get(req.selected_shipping_id)
+            if opt is not None:
+                session.selected_shipping = opt
+                session._shipping_cents = _cents(opt["price"])
+
+        # Check free shipping threshold
+        if session._subtotal_cents >= _cents(self.free_shipping_threshold):
+            session._shipping_cents = 0
+
+        _recalc_totals(session)
+
+        # Advance state if we have enough info
+        if session.shipping_address and session.state == _STATE_INCOMPLETE:
+            session.state = _STATE_READY
+
+        session.updated_at = datetime.now(tz=timezone.utc).isoformat()
+        return session
+
+    async def complete_checkout(self, session_id: str) -> dict[str, Any]:
+        """Complete a checkout session and create an order."""
+        session = self._checkout_sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Checkout session not found")
+
+        if session.state not in _COMPLETABLE_STATES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot complete session in state: {session.state}",
+            )
+
+        # Create order
+        now_iso = datetime.now(tz=timezone.utc).isoformat()
+        order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
+        tracking_number = f"TRK{uuid.uuid4().hex[:10].upper()}"
+        order = Order(
+            id=order_id,
+            checkout_session_id=session_id,
+            state=_STATE_CONFIRMED,
+            line_items=session.line_items,
+            shipping_address=session.shipping_address,
+            subtotal=session.subtotal,
+            tax=session.tax,
+            shipping_cost=session.shipping_cost,
+            total=session.total,
+            tracking_number=tracking_number,
+            tracking_url=f"https://tracking.example.com/{tracking_number}",
+            created_at=now_iso,
+            history=[
+                OrderEvent(
+                    event_type="order_confirmed",
+                    message="Order has been confirmed and is being processed.",
+                    timestamp=now_iso,
+                )
+            ],
+        )
+
+        self._orders[order_id] = order
+        self._orders_list.append(order)
+
+        # Update session state
+        session.state = _STATE_COMPLETED
+        session.order_id = order_id
+        session.completed_at = now_iso
+
+        return {
+            "id": session_id,
+            "state": _STATE_COMPLETED,
+            "order_id": order_id,
+            "total": session.total,
+            "tracking_url": order.tracking_url,
+        }
+
+    # -- Orders --------------------------------------------------------
+
+    async def get_order(self, order_id: str) -> Order:
+        """Retrieve order details."""
+        order = self._orders.get(order_id)
+        if order is None:
+            raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
+        return order
+
+    def list_orders(
+        self,
+        limit: int = Query(50, ge=1, le=200),
+        offset: int = Query(0, ge=0),
+    ) -> Response:
+        """List orders, oldest first."""
+        orders = self._orders_list
+        return _json_response(
+            {
+                "orders": orders[offset : offset + limit],
+                "total": len(orders),
+                "offset": offset,
+                "limit": limit,
             }
+        )
 
-            merchant._orders[order_id] = order
-
-            # Update session state
-            session["state"] = "completed"
-            session["order_id"] = order_id
-            session["completed_at"] = datetime.now(tz=timezone.utc).isoformat()
-
-            return {
-                "id": session_id,
-                "state": "completed",
-                "order_id": order_id,
-                "total": session["total"],
-                "tracking_url": order["tracking_url"],
-            }
+    # ------------------------------------------------------------------
+    # Discovery manifest
+    # ------------------------------------------------------------------
 
-        # -- Orders ----------------------------------------------------
+    def _build_manifest(self) -> dict[str, Any]:
+        """Build the UCP discovery manifest (static for the app's lifetime)."""
+        return {
+            "spec_version": "0.1.0",
+            "merchant_name": self.name,
+            "merchant_domain": f"{self.merchant_id}.example.com",
+            "merchant_id": self.merchant_id,
+            "base_url": self.base_path,
+            "capabilities": [
+                {
+                    "id": "catalog.search",
+                    "version": "1.0",
+                    "description": "Full-text product search",
+                },
+                {
+                    "id": "catalog.search.batch",
+                    "version": "1.0",
+                    "description": "Multi-query product search in one request",
+                },
+                {
+                    "id": "catalog.browse",
+                    "version": "1.0",
+                    "description": "Browse product catalog",
+                },
+                {
+                    "id": "checkout",
+                    "version": "1.0",
+                    "description": "Checkout session management",
+                },
+                {
+                    "id": "orders",
+                    "version": "1.0",
+                    "description": "Order tracking",
+                },
+            ],
+            "extensions": [
+                {
+                    "id": "discounts",
+                    "version": "1.0",
+                    "description": "Discount code support",
+                },
+                {
+                    "id": "fulfillment",
+                    "version": "1.0",
+                    "description": "Multiple shipping options",
+                },
+            ],
+            "payment_handlers": [
+                {
+                    "id": "mock_payment",
+                    "name": "Mock Payment",
+                    "description": "Simulated payment for demo",
+                    "handler_url": f"{self.base_path}/api/v1/payments",
+                    "supported_currencies": [_USD],
+                },
+            ],
+            "endpoints": {
+                "catalog": f"{self.base_path}/api/v1/catalog/products",
+                "catalog_search": f"{self.base_path}/api/v1/catalog/search",
+                "checkout": f"{self.base_path}/api/v1/checkout/sessions",
+                "orders": f"{self.base_path}/api/v1/orders",
+                "negotiate": f"{self.base_path}/api/v1/negotiate",
+            },
+            "metadata": {
+                "free_shipping_threshold": self.free_shipping_threshold,
+                "currency": _USD,
+                "return_policy": "30-day returns",
+            },
+        }
 
-        @app.get("/api/v1/orders/{order_id}")
-        async def get_order(order_id: str) -> dict[str, Any]:
-            """Retrieve order details."""
-            order = merchant._orders.get(order_id)
-            if order is None:
-                raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
-            return order
-
-        @app.get("/api/v1/orders")
-        async def list_orders() -> dict[str, Any]:
-            """List all orders."""
-            return {
-                "orders": list(merchant._orders.values()),
-                "total": len(merchant._orders),
-            }
+    # ------------------------------------------------------------------
+    # Catalog search
+    # ------------------------------------------------------------------
 
-        return app
+    def _search_catalog(
+        self,
+        q: str,
+        category: str | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ) -> Iterator[bytes]:
+        """Yield all products matching the query and filters, in catalog order.
+
+        Products are yielded as their pre-encoded JSON, ready to splice
+        into a response body.
+        """
+        # Any-keyword match as one C-level regex scan per candidate.  A
+        # whitespace-only query has no keywords and matches nothing.
+        entries = self._search_index
+        search = None
+        if q:
+            keywords = q.lower().split()
+            if not keywords:
+                return
+            search = re.compile("|".join(map(re.escape, keywords))).search
+            candidates = self._keyword_candidates(keywords)
+            if candidates is not None:
+                entries = [entries[pos] for pos in sorted(candidates)]
+        category_lower = category.lower() if category else None
+
+        # One pass over the candidates, cheapest predicates first
+        for product, text, product_category, encoded in entries:
+            if category_lower is not None and product_category != category_lower:
+                continue
+            if min_price is not None or max_price is not None:
+                price = product.get("price", 0)
+                if min_price is not None and price < min_price:
+                    continue
+                if max_price is not None and price > max_price:
+                    continue
+            if search is not None and not search(text):
+                continue
+            yield encoded
+
+    def _keyword_candidates(self, keywords: list[str]) -> set[int] | None:
+        """Return index positions that may contain any of *keywords*.
+
+        A product can only contain a keyword if it contains every trigram
+        of it.  Returns ``None`` (scan everything) when a keyword is too
+        short to have a trigram.
+        """
+        candidates: set[int] = set()
+        for keyword in keywords:
+            if len(keyword) < _TRIGRAM:
+                return None
+            postings = sorted(
+                (
+                    self._trigram_index.get(keyword[i : i + _TRIGRAM], frozenset())
+                    for i in range(len(keyword) - _TRIGRAM + 1)
+                ),
+                key=len,
+            )
+            candidates |= postings[0].intersection(*postings[1:])
+        return candidates
@@ -7,6 +7,7 @@ the bundled JSON catalog files.
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -17,6 +18,15 @@ from ucp_shopping.mock_merchants.merchant_app import MockMerchantApp
 _CATALOG_DIR = Path(__file__).parent / "catalogs"
 
 
+@lru_cache(maxsize=None)
+def _load_catalog(catalog_file: str) -> tuple[dict[str, Any], ...]:
+    """Read and parse a bundled catalog once per process."""
+    catalog_path = _CATALOG_DIR / catalog_file
+    if not catalog_path.exists():
+        raise FileNotFoundError(f"Catalog file not found: {catalog_path}")
+    return tuple(json.loads(catalog_path.read_bytes()))
+
+
 class MerchantFactory:
     """Factory for creating mock UCP merchant sub-applications."""
 
@@ -54,12 +64,9 @@ class MerchantFactory:
         MockMerchantApp
             A configured mock merchant with its FastAPI sub-app.
         """
-        catalog_path = _CATALOG_DIR / catalog_file
-        if not catalog_path.exists():
-            raise FileNotFoundError(f"Catalog file not found: {catalog_path}")
-
-        with open(catalog_path) as f:
-            products = json.load(f)
+        # Merchants enrich their product dicts in place, so each one gets
+        # its own top-level copies of the cached records
+        products = [dict(p) for p in _load_catalog(catalog_file)]
 
         return MockMerchantApp(
             name=name,
@@ -8,11 +8,31 @@ SSE events, and MCP tool definitions.
 from __future__ import annotations
 
 import enum
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+
+def _utcnow() -> datetime:
+    """Timezone-aware UTC now, for timestamp defaults.
+
+    Hot paths (session writes, SSE events, comparisons, checkouts) pass a
+    timestamp read once per operation; this only fills in the rest.
+    """
+    return datetime.now(tz=timezone.utc)
+
+
+class _Model(BaseModel):
+    """Base for this module's models.
+
+    Schemas are built on first use rather than at import, so processes that
+    only touch a few models (the CLI, tests, MCP clients) never pay for the
+    rest.  Hot models can be built ahead of time with ``model_rebuild()``.
+    """
+
+    model_config = ConfigDict(defer_build=True)
 
 
 # ---------------------------------------------------------------------------
@@ -20,7 +40,7 @@ from pydantic import BaseModel, Field
 # ---------------------------------------------------------------------------
 
 
-class ShoppingPreferences(BaseModel):
+class ShoppingPreferences(_Model):
     """User preferences that influence search, comparison, and optimization."""
 
     prefer_single_merchant: bool = False
@@ -31,7 +51,7 @@ class ShoppingPreferences(BaseModel):
     min_rating: float | None = None
 
 
-class ShoppingRequest(BaseModel):
+class ShoppingRequest(_Model):
     """Top-level shopping request submitted by a user or agent."""
 
     query: str
@@ -58,7 +78,7 @@ class ShoppingSessionState(str, enum.Enum):
     FAILED = "failed"
 
 
-class ShoppingSession(BaseModel):
+class ShoppingSession(_Model):
     """Full state of a shopping session."""
 
     id: str
@@ -70,8 +90,8 @@ class ShoppingSession(BaseModel):
     optimization_plan: SplitOrderPlan | None = None
     orders: list[OrderSummary] = Field(default_factory=list)
     error: str | None = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
 
 
 # ---------------------------------------------------------------------------
@@ -79,7 +99,7 @@ class ShoppingSession(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-class MerchantInfo(BaseModel):
+class MerchantInfo(_Model):
     """Parsed UCP merchant manifest."""
 
     id: str
@@ -99,8 +119,14 @@ class MerchantInfo(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-class ShippingOption(BaseModel):
-    """A shipping method available for a product."""
+class ShippingOption(_Model):
+    """A shipping method available for a product.
+
+    Frozen: a merchant's options are parsed once per search response and
+    shared by every product in it.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     id: str = "standard"
     name: str = "Standard Shipping"
@@ -110,7 +136,7 @@ class ShippingOption(BaseModel):
     is_free: bool = False
 
 
-class ProductResult(BaseModel):
+class ProductResult(_Model):
     """A single product result returned from a merchant."""
 
     product_id: str
@@ -131,15 +157,37 @@ class ProductResult(BaseModel):
     rating: float = 0.0
     score: float = 0.0
 
+    # (shipping_options list, its cheapest price) from the last lookup
+    _shipping_cache: tuple[list[ShippingOption], float] | None = PrivateAttr(None)
+
+    @property
+    def cheapest_shipping_cost(self) -> float:
+        """Cheapest shipping price, assuming standard shipping when none is listed.
+
+        Comparison and optimisation both read it several times, so it is
+        cached against the ``shipping_options`` list it was computed from.
+        Assigning a new list (directly or through ``model_copy(update=...)``)
+        recomputes it; mutating the list in place does not.
+        """
+        cached = self._shipping_cache
+        if cached is not None and cached[0] is self.shipping_options:
+            return cached[1]
+        options = self.shipping_options
+        cost = min(so.price for so in options) if options else 5.99
+        self._shipping_cache = (options, cost)
+        return cost
+
 
 # ---------------------------------------------------------------------------
 # Comparison matrix
 # ---------------------------------------------------------------------------
 
 
-class ComparisonEntry(BaseModel):
+class ComparisonEntry(_Model):
     """Comparison of a single product query across merchants."""
 
+    model_config = ConfigDict(frozen=True)
+
     product_query: str
     merchant_results: list[ProductResult] = Field(default_factory=list)
     best_price: ProductResult | None = None
@@ -147,13 +195,13 @@ class ComparisonEntry(BaseModel):
     recommended: ProductResult | None = None
 
 
-class ComparisonMatrix(BaseModel):
+class ComparisonMatrix(_Model):
     """Multi-item comparison matrix across merchants."""
 
     entries: list[ComparisonEntry] = Field(default_factory=list)
     total_merchants: int = 0
     total_products_found: int = 0
-    generated_at: datetime = Field(default_factory=datetime.utcnow)
+    generated_at: datetime = Field(default_factory=_utcnow)
 
 
 # ---------------------------------------------------------------------------
@@ -161,7 +209,7 @@ class ComparisonMatrix(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-class SplitOrderItem(BaseModel):
+class SplitOrderItem(_Model):
     """A single item in a split-order plan."""
 
     product_name: str
@@ -179,7 +227,7 @@ class SplitOrderItem(BaseModel):
             self.total = round(self.price + self.shipping_cost, 2)
 
 
-class SplitOrderPlan(BaseModel):
+class SplitOrderPlan(_Model):
     """Optimized purchase plan that may split across merchants."""
 
     items: list[SplitOrderItem] = Field(default_factory=list)
@@ -196,7 +244,7 @@ class SplitOrderPlan(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-class CheckoutStatus(BaseModel):
+class CheckoutStatus(_Model):
     """Status of a checkout at a single merchant."""
 
     merchant_id: str
@@ -207,7 +255,7 @@ class CheckoutStatus(BaseModel):
     order_id: str | None = None
 
 
-class OrderSummary(BaseModel):
+class OrderSummary(_Model):
     """Summary of a completed order at a single merchant."""
 
     merchant_name: str
@@ -217,7 +265,7 @@ class OrderSummary(BaseModel):
     total: float = 0.0
     status: str = "confirmed"
     tracking_url: str | None = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_utcnow)
 
 
 # ---------------------------------------------------------------------------
@@ -225,14 +273,26 @@ class OrderSummary(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-class ShoppingEvent(BaseModel):
+class ShoppingEvent(_Model):
     """Server-Sent Event pushed during shopping workflow execution."""
 
     event_type: str
     session_id: str
     data: dict[str, Any] = Field(default_factory=dict)
     message: str = ""
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_utcnow)
+
+    _encoded: str | None = PrivateAttr(default=None)
+
+    def encoded(self) -> str:
+        """Return the event's JSON encoding, computed on first use.
+
+        Emitted events are never modified, so every SSE subscriber and
+        history replay reuses one encoding.
+        """
+        if self._encoded is None:
+            self._encoded = self.model_dump_json()
+        return self._encoded
 
 
 # ---------------------------------------------------------------------------
@@ -240,7 +300,7 @@ class ShoppingEvent(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-class MCPToolDefinition(BaseModel):
+class MCPToolDefinition(_Model):
     """MCP tool definition with JSON-Schema input specification."""
 
     name: str
@@ -248,7 +308,7 @@ class MCPToolDefinition(BaseModel):
     inputSchema: dict[str, Any]  # noqa: N815
 
 
-class MCPToolResult(BaseModel):
+class MCPToolResult(_Model):
     """Result of executing an MCP tool."""
 
     tool_name: str
@@ -262,7 +322,7 @@ class MCPToolResult(BaseModel):
 # ---------------------------------------------------------------------------
 
 
-class ShoppingPlanItem(BaseModel):
+class ShoppingPlanItem(_Model):
     """A single item the planner extracted from the user query."""
 
     name: str
@@ -272,14 +332,10 @@ class ShoppingPlanItem(BaseModel):
     features: list[str] = Field(default_factory=list)
 
 
-class ShoppingPlan(BaseModel):
+class ShoppingPlan(_Model):
     """LLM-parsed shopping intent with structured items and constraints."""
 
     items: list[ShoppingPlanItem] = Field(default_factory=list)
     overall_budget: Decimal | None = None
     preferences: ShoppingPreferences = Field(default_factory=ShoppingPreferences)
     reasoning: str = ""
-
-
-# Rebuild forward references so nested models resolve correctly
-ShoppingSession.model_rebuild()
@@ -17,7 +17,7 @@ Edges (with conditional routing)
 plan -> discover
 discover -> search (if merchants found) | fail
 search -> compare
-compare -> optimize (if multi-item) | present (single item)
+compare -> optimize
 optimize -> present
 present -> wait
 wait -> checkout (if confirmed) | fail
@@ -26,6 +26,8 @@ checkout -> complete
 
 from __future__ import annotations
 
+from functools import partial
+
 import structlog
 from langgraph.graph import END, StateGraph
 
@@ -35,9 +37,15 @@ from ucp_shopping.agents.discovery_agent import DiscoveryAgent
 from ucp_shopping.agents.optimizer import SplitOrderOptimizer
 from ucp_shopping.agents.search_agent import SearchAgent
 from ucp_shopping.config import Settings
-from ucp_shopping.models import ShoppingSessionState
+from ucp_shopping.models import (
+    ComparisonMatrix,
+    ProductResult,
+    ShoppingPlan,
+    ShoppingSessionState,
+)
 from ucp_shopping.orchestrator.planner import ShoppingPlanner
 from ucp_shopping.orchestrator.state import ShoppingGraphState
+from ucp_shopping.protocols.ucp_client import UCPClient
 from ucp_shopping.streaming import (
     EVENT_AWAITING_CONFIRMATION,
     EVENT_CHECKING_OUT,
@@ -58,349 +66,353 @@ logger = structlog.get_logger(__name__)
 
 
 # ---------------------------------------------------------------------------
-# Node factories
+# Nodes
+#
+# Nodes are module-level coroutines taking their collaborators as keyword
+# arguments; ``build_shopping_graph`` binds them with ``functools.partial``.
+# Each returns only the state keys it changes, which LangGraph merges.
 # ---------------------------------------------------------------------------
 
 
-def _make_plan_node(planner: ShoppingPlanner, stream: ShoppingEventStream):
-    """Create the *plan* node function."""
+def _plan_queries(plan: ShoppingPlan) -> list[str]:
+    """Return one catalog search query per plan item."""
+    return [" ".join(item.keywords) if item.keywords else item.name for item in plan.items]
 
-    async def plan_node(state: ShoppingGraphState) -> ShoppingGraphState:
-        """Parse the shopping query into a structured plan."""
-        session_id = state.get("session_id", "")
-        request = state["request"]
 
-        await stream.emit(session_id, EVENT_PLANNING, message="Analyzing your shopping request...")
+async def _plan_node(
+    state: ShoppingGraphState,
+    *,
+    planner: ShoppingPlanner,
+    stream: ShoppingEventStream,
+) -> ShoppingGraphState:
+    """Parse the shopping query into a structured plan."""
+    session_id = state.get("session_id", "")
+    request = state["request"]
 
-        try:
-            plan = await planner.plan(request.query)
-            item_names = [item.name for item in plan.items]
-            await stream.emit(
-                session_id,
-                EVENT_PLANNING,
-                data={"items": item_names, "reasoning": plan.reasoning},
-                message=f"Found {len(plan.items)} item(s) to search for: {', '.join(item_names)}",
-            )
-            return {
-                **state,
-                "shopping_plan": plan,
-                "current_state": ShoppingSessionState.DISCOVERING,
-                "error": None,
-                "messages": state.get("messages", [])
-                + [{"role": "system", "content": f"Plan: {plan.reasoning}"}],
-            }
-        except Exception as exc:
-            logger.exception("plan_node_error")
-            await stream.emit(session_id, EVENT_ERROR, message=f"Planning failed: {exc}")
-            return {**state, "error": f"Planning failed: {exc}"}
-
-    return plan_node
-
-
-def _make_discover_node(discovery: DiscoveryAgent, stream: ShoppingEventStream):
-    """Create the *discover* node function."""
-
-    async def discover_node(state: ShoppingGraphState) -> ShoppingGraphState:
-        session_id = state.get("session_id", "")
-        await stream.emit(session_id, EVENT_SEARCHING, message="Discovering UCP merchants...")
-
-        try:
-            merchants, failed = await discovery.discover_merchants_with_failures()
-            await stream.emit(
-                session_id,
-                EVENT_MERCHANTS_DISCOVERED,
-                data={
-                    "merchants": [m.name for m in merchants],
-                    "failed": failed,
-                },
-                message=f"Discovered {len(merchants)} merchant(s).",
-            )
-            return {
-                **state,
-                "discovered_merchants": merchants,
-                "failed_merchants": failed,
-                "current_state": (
-                    ShoppingSessionState.SEARCHING
-                    if merchants
-                    else ShoppingSessionState.FAILED
-                ),
-                "error": None if merchants else "No merchants discovered.",
-            }
-        except Exception as exc:
-            logger.exception("discover_node_error")
-            await stream.emit(session_id, EVENT_ERROR, message=f"Discovery failed: {exc}")
-            return {
-                **state,
-                "discovered_merchants": [],
-                "failed_merchants": [],
-                "error": f"Discovery failed: {exc}",
-            }
-
-    return discover_node
-
-
-def _make_search_node(search_agent: SearchAgent, stream: ShoppingEventStream):
-    """Create the *search* node function."""
-
-    async def search_node(state: ShoppingGraphState) -> ShoppingGraphState:
-        session_id = state.get("session_id", "")
-        merchants = state.get("discovered_merchants", [])
-        plan = state.get("shopping_plan")
-
-        if not plan or not plan.items:
-            return {**state, "error": "No shopping plan available."}
-
-        queries = []
-        for item in plan.items:
-            if item.keywords:
-                queries.append(" ".join(item.keywords))
-            else:
-                queries.append(item.name)
+    await stream.emit(session_id, EVENT_PLANNING, message="Analyzing your shopping request...")
 
+    try:
+        plan = await planner.plan(request.query)
+        item_names = [item.name for item in plan.items]
         await stream.emit(
             session_id,
-            EVENT_SEARCHING,
-            data={"queries": queries, "merchant_count": len(merchants)},
-            message=f"Searching {len(merchants)} merchant(s) for {len(queries)} item(s)...",
+            EVENT_PLANNING,
+            data={"items": item_names, "reasoning": plan.reasoning},
+            message=f"Found {len(plan.items)} item(s) to search for: {', '.join(item_names)}",
         )
+        return {
+            "shopping_plan": plan,
+            "search_queries": _plan_queries(plan),
+            "current_state": ShoppingSessionState.DISCOVERING,
+            "error": None,
+            "messages": [{"role": "system", "content": f"Plan: {plan.reasoning}"}],
+        }
+    except Exception as exc:
+        logger.exception("plan_node_error")
+        await stream.emit(session_id, EVENT_ERROR, message=f"Planning failed: {exc}")
+        return {"error": f"Planning failed: {exc}"}
 
-        try:
-            results = await search_agent.search_all_merchants(merchants, queries)
-            total_products = sum(len(v) for v in results.values())
-
-            # Merge all results into a flat list
-            merged: list = []
-            for product_list in results.values():
-                merged.extend(product_list)
-
-            await stream.emit(
-                session_id,
-                EVENT_PRODUCTS_FOUND,
-                data={"total_products": total_products, "per_merchant": {k: len(v) for k, v in results.items()}},
-                message=f"Found {total_products} product(s) across {len(results)} merchant(s).",
-            )
-            return {
-                **state,
-                "search_results": results,
-                "merged_results": merged,
-                "current_state": ShoppingSessionState.COMPARING,
-                "error": None,
-            }
-        except Exception as exc:
-            logger.exception("search_node_error")
-            await stream.emit(session_id, EVENT_ERROR, message=f"Search failed: {exc}")
-            return {**state, "error": f"Search failed: {exc}"}
-
-    return search_node
-
-
-def _make_compare_node(comparison: ComparisonAgent, stream: ShoppingEventStream):
-    """Create the *compare* node function."""
-
-    async def compare_node(state: ShoppingGraphState) -> ShoppingGraphState:
-        session_id = state.get("session_id", "")
-        search_results = state.get("search_results", {})
-        plan = state.get("shopping_plan")
 
-        item_names = [item.name for item in (plan.items if plan else [])]
+async def _discover_node(
+    state: ShoppingGraphState,
+    *,
+    discovery: DiscoveryAgent,
+    stream: ShoppingEventStream,
+) -> ShoppingGraphState:
+    """Discover UCP merchants from the configured URLs."""
+    session_id = state.get("session_id", "")
+    await stream.emit(session_id, EVENT_SEARCHING, message="Discovering UCP merchants...")
 
+    try:
+        merchants, failed = await discovery.discover_merchants_with_failures()
         await stream.emit(
             session_id,
-            EVENT_COMPARING,
-            message="Building price comparison matrix...",
+            EVENT_MERCHANTS_DISCOVERED,
+            data={
+                "merchants": [m.name for m in merchants],
+                "failed": failed,
+            },
+            message=f"Discovered {len(merchants)} merchant(s).",
         )
+        return {
+            "discovered_merchants": merchants,
+            "merchants_map": {m.id: m for m in merchants},
+            "failed_merchants": failed,
+            "current_state": (
+                ShoppingSessionState.SEARCHING
+                if merchants
+                else ShoppingSessionState.FAILED
+            ),
+            "error": None if merchants else "No merchants discovered.",
+        }
+    except Exception as exc:
+        logger.exception("discover_node_error")
+        await stream.emit(session_id, EVENT_ERROR, message=f"Discovery failed: {exc}")
+        return {
+            "discovered_merchants": [],
+            "merchants_map": {},
+            "failed_merchants": [],
+            "error": f"Discovery failed: {exc}",
+        }
 
-        try:
-            matrix = await comparison.build_comparison(search_results, item_names)
-            await stream.emit(
-                session_id,
-                EVENT_COMPARISON_READY,
-                data={
-                    "entries": len(matrix.entries),
-                    "total_products": matrix.total_products_found,
-                },
-                message=f"Comparison ready: {len(matrix.entries)} item(s) compared.",
-            )
-            return {
-                **state,
-                "comparison_matrix": matrix,
-                "current_state": ShoppingSessionState.OPTIMIZING,
-                "error": None,
-            }
-        except Exception as exc:
-            logger.exception("compare_node_error")
-            await stream.emit(session_id, EVENT_ERROR, message=f"Comparison failed: {exc}")
-            return {**state, "error": f"Comparison failed: {exc}"}
 
-    return compare_node
+async def _search_node(
+    state: ShoppingGraphState,
+    *,
+    search_agent: SearchAgent,
+    stream: ShoppingEventStream,
+) -> ShoppingGraphState:
+    """Search every discovered merchant for each plan item."""
+    session_id = state.get("session_id", "")
+    merchants = state.get("discovered_merchants", [])
+    plan = state.get("shopping_plan")
+
+    if not plan or not plan.items:
+        return {"error": "No shopping plan available."}
 
+    queries = state.get("search_queries") or _plan_queries(plan)
 
-def _make_optimize_node(optimizer: SplitOrderOptimizer, stream: ShoppingEventStream):
-    """Create the *optimize* node function."""
+    await stream.emit(
+        session_id,
+        EVENT_SEARCHING,
+        data={"queries": queries, "merchant_count": len(merchants)},
+        message=f"Searching {len(merchants)} merchant(s) for {len(queries)} item(s)...",
+    )
 
-    async def optimize_node(state: ShoppingGraphState) -> ShoppingGraphState:
-        session_id = state.get("session_id", "")
-        matrix = state.get("comparison_matrix")
-        preferences = state.get("preferences")
+    try:
+        results = await search_agent.search_all_merchants(merchants, queries)
+        total_products = sum(len(v) for v in results.values())
 
-        if not matrix:
-            return {**state, "error": "No comparison matrix available."}
+        # Merge all results into a flat list
+        merged: list = []
+        for product_list in results.values():
+            merged.extend(product_list)
 
         await stream.emit(
             session_id,
-            EVENT_OPTIMIZING,
-            message="Optimizing purchase across merchants...",
+            EVENT_PRODUCTS_FOUND,
+            data={"total_products": total_products, "per_merchant": {k: len(v) for k, v in results.items()}},
+            message=f"Found {total_products} product(s) across {len(results)} merchant(s).",
         )
+        return {
+            "search_results": results,
+            "merged_results": merged,
+            "current_state": ShoppingSessionState.COMPARING,
+            "error": None,
+        }
+    except Exception as exc:
+        logger.exception("search_node_error")
+        await stream.emit(session_id, EVENT_ERROR, message=f"Search failed: {exc}")
+        return {"error": f"Search failed: {exc}"}
 
-        try:
-            plan = await optimizer.optimize(matrix, preferences)
-            await stream.emit(
-                session_id,
-                EVENT_OPTIMIZATION_READY,
-                data={
-                    "grand_total": plan.grand_total,
-                    "merchants_used": plan.merchants_used,
-                    "savings": plan.savings_vs_single,
-                },
-                message=(
-                    f"Optimization complete: ${plan.grand_total:.2f} total "
-                    f"across {plan.merchants_used} merchant(s). "
-                    f"Savings: ${plan.savings_vs_single:.2f}"
-                ),
-            )
-            return {
-                **state,
-                "optimization_plan": plan,
-                "current_state": ShoppingSessionState.AWAITING_CONFIRMATION,
-                "error": None,
-            }
-        except Exception as exc:
-            logger.exception("optimize_node_error")
-            await stream.emit(session_id, EVENT_ERROR, message=f"Optimization failed: {exc}")
-            return {**state, "error": f"Optimization failed: {exc}"}
-
-    return optimize_node
-
-
-def _make_present_node(stream: ShoppingEventStream):
-    """Create the *present* node -- prepares the summary for the user."""
-
-    async def present_node(state: ShoppingGraphState) -> ShoppingGraphState:
-        session_id = state.get("session_id", "")
-        plan = state.get("optimization_plan")
-
-        summary_lines: list[str] = []
-        if plan:
-            summary_lines.append(f"Total: ${plan.grand_total:.2f}")
-            for item in plan.items:
-                summary_lines.append(
-                    f"  - {item.product_name} from {item.merchant_name}: "
-                    f"${item.price:.2f} + ${item.shipping_cost:.2f} shipping"
-                )
-            if plan.savings_vs_single > 0:
-                summary_lines.append(
-                    f"  Savings vs single merchant: ${plan.savings_vs_single:.2f}"
-                )
 
+async def _compare_node(
+    state: ShoppingGraphState,
+    *,
+    comparison: ComparisonAgent,
+    stream: ShoppingEventStream,
+) -> ShoppingGraphState:
+    """Build the comparison matrix from the search results."""
+    session_id = state.get("session_id", "")
+    search_results = state.get("search_results", {})
+    plan = state.get("shopping_plan")
+
+    item_names = [item.name for item in (plan.items if plan else [])]
+
+    await stream.emit(
+        session_id,
+        EVENT_COMPARING,
+        message="Building price comparison matrix...",
+    )
+
+    try:
+        matrix = await comparison.build_comparison(search_results, item_names)
         await stream.emit(
             session_id,
-            EVENT_AWAITING_CONFIRMATION,
-            data={"summary": summary_lines, "plan": plan.model_dump() if plan else {}},
-            message="Please review and confirm your order.",
+            EVENT_COMPARISON_READY,
+            data={
+                "entries": len(matrix.entries),
+                "total_products": matrix.total_products_found,
+            },
+            message=f"Comparison ready: {len(matrix.entries)} item(s) compared.",
         )
         return {
-            **state,
-            "current_state": ShoppingSessionState.AWAITING_CONFIRMATION,
+            "comparison_matrix": matrix,
+            "current_state": ShoppingSessionState.OPTIMIZING,
+            "error": None,
         }
+    except Exception as exc:
+        logger.exception("compare_node_error")
+        await stream.emit(session_id, EVENT_ERROR, message=f"Comparison failed: {exc}")
+        return {"error": f"Comparison failed: {exc}"}
 
-    return present_node
 
+async def _optimize_node(
+    state: ShoppingGraphState,
+    *,
+    optimizer: SplitOrderOptimizer,
+    stream: ShoppingEventStream,
+) -> ShoppingGraphState:
+    """Optimize the purchase across merchants."""
+    session_id = state.get("session_id", "")
+    matrix = state.get("comparison_matrix")
+    preferences = state.get("preferences")
 
-def _make_wait_node(stream: ShoppingEventStream):
-    """Create the *wait_for_confirmation* node.
+    if not matrix:
+        return {"error": "No comparison matrix available."}
 
-    In a real system this would block until the user confirms.  Here we
-    simply read the ``user_confirmed`` flag from state, which gets set
-    externally via the ``/confirm`` API endpoint.
-    """
+    await stream.emit(
+        session_id,
+        EVENT_OPTIMIZING,
+        message="Optimizing purchase across merchants...",
+    )
+
+    try:
+        plan = await optimizer.optimize(matrix, preferences)
+        await stream.emit(
+            session_id,
+            EVENT_OPTIMIZATION_READY,
+            data={
+                "grand_total": plan.grand_total,
+                "merchants_used": plan.merchants_used,
+                "savings": plan.savings_vs_single,
+            },
+            message=(
+                f"Optimization complete: ${plan.grand_total:.2f} total "
+                f"across {plan.merchants_used} merchant(s). "
+                f"Savings: ${plan.savings_vs_single:.2f}"
+            ),
+        )
+        return {
+            "optimization_plan": plan,
+            "current_state": ShoppingSessionState.AWAITING_CONFIRMATION,
+            "error": None,
+        }
+    except Exception as exc:
+        logger.exception("optimize_node_error")
+        await stream.emit(session_id, EVENT_ERROR, message=f"Optimization failed: {exc}")
+        return {"error": f"Optimization failed: {exc}"}
 
-    async def wait_node(state: ShoppingGraphState) -> ShoppingGraphState:
-        confirmed = state.get("user_confirmed", False)
-        session_id = state.get("session_id", "")
 
-        if not confirmed:
-            await stream.emit(
-                session_id,
-                EVENT_AWAITING_CONFIRMATION,
-                message="Waiting for your confirmation...",
+async def _present_node(
+    state: ShoppingGraphState,
+    *,
+    stream: ShoppingEventStream,
+) -> ShoppingGraphState:
+    """Prepare the summary for the user and ask for confirmation."""
+    session_id = state.get("session_id", "")
+    plan = state.get("optimization_plan")
+
+    summary_lines: list[str] = []
+    if plan:
+        summary_lines.append(f"Total: ${plan.grand_total:.2f}")
+        for item in plan.items:
+            summary_lines.append(
+                f"  - {item.product_name} from {item.merchant_name}: "
+                f"${item.price:.2f} + ${item.shipping_cost:.2f} shipping"
+            )
+        if plan.savings_vs_single > 0:
+            summary_lines.append(
+                f"  Savings vs single merchant: ${plan.savings_vs_single:.2f}"
             )
-        return {**state, "user_confirmed": confirmed}
-
-    return wait_node
 
+    await stream.emit(
+        session_id,
+        EVENT_AWAITING_CONFIRMATION,
+        # Models go into event data as-is: pydantic-core encodes them
+        # straight to JSON when the event is sent, with no dict copy.
+        data={"summary": summary_lines, "plan": plan if plan else {}},
+        message="Please review and confirm your order.",
+    )
+    return {
+        "current_state": ShoppingSessionState.AWAITING_CONFIRMATION,
+    }
 
-def _make_checkout_node(checkout_agent: CheckoutAgent, stream: ShoppingEventStream):
-    """Create the *checkout* node function."""
 
-    async def checkout_node(state: ShoppingGraphState) -> ShoppingGraphState:
-        session_id = state.get("session_id", "")
-        plan = state.get("optimization_plan")
-        merchants = state.get("discovered_merchants", [])
+async def _wait_node(
+    state: ShoppingGraphState,
+    *,
+    stream: ShoppingEventStream,
+) -> ShoppingGraphState:
+    """Human-in-the-loop confirmation gate.
 
-        if not plan:
-            return {**state, "error": "No optimization plan for checkout."}
+    In a real system this would block until the user confirms.  Here we
+    simply read the ``user_confirmed`` flag from state, which gets set
+    externally via the ``/confirm`` API endpoint.
+    """
+    confirmed = state.get("user_confirmed", False)
+    session_id = state.get("session_id", "")
 
+    if not confirmed:
         await stream.emit(
             session_id,
-            EVENT_CHECKING_OUT,
-            message=f"Checking out with {plan.merchants_used} merchant(s)...",
+            EVENT_AWAITING_CONFIRMATION,
+            message="Waiting for your confirmation...",
         )
-
-        try:
-            merchants_map = {m.id: m for m in merchants}
-            orders = await checkout_agent.execute_checkouts(plan, merchants_map, stream, session_id)
-            return {
-                **state,
-                "completed_orders": orders,
-                "current_state": ShoppingSessionState.COMPLETED,
-                "error": None,
-            }
-        except Exception as exc:
-            logger.exception("checkout_node_error")
-            await stream.emit(session_id, EVENT_ERROR, message=f"Checkout failed: {exc}")
-            return {**state, "error": f"Checkout failed: {exc}"}
-
-    return checkout_node
+    return {"user_confirmed": confirmed}
 
 
-def _make_complete_node(stream: ShoppingEventStream):
-    """Create the *complete* node -- emits the final completion event."""
-
-    async def complete_node(state: ShoppingGraphState) -> ShoppingGraphState:
-        session_id = state.get("session_id", "")
-        orders = state.get("completed_orders", [])
+async def _checkout_node(
+    state: ShoppingGraphState,
+    *,
+    checkout_agent: CheckoutAgent,
+    stream: ShoppingEventStream,
+) -> ShoppingGraphState:
+    """Execute checkouts at the merchants in the optimization plan."""
+    session_id = state.get("session_id", "")
+    plan = state.get("optimization_plan")
+
+    if not plan:
+        return {"error": "No optimization plan for checkout."}
+
+    await stream.emit(
+        session_id,
+        EVENT_CHECKING_OUT,
+        message=f"Checking out with {plan.merchants_used} merchant(s)...",
+    )
 
-        await stream.emit(
-            session_id,
-            EVENT_COMPLETED,
-            data={
-                "order_count": len(orders),
-                "orders": [o.model_dump() for o in orders] if orders else [],
-            },
-            message=f"Shopping complete! {len(orders)} order(s) placed.",
-        )
+    try:
+        merchants_map = state.get("merchants_map") or {
+            m.id: m for m in state.get("discovered_merchants", [])
+        }
+        orders = await checkout_agent.execute_checkouts(plan, merchants_map, stream, session_id)
         return {
-            **state,
+            "completed_orders": orders,
             "current_state": ShoppingSessionState.COMPLETED,
+            "error": None,
         }
+    except Exception as exc:
+        logger.exception("checkout_node_error")
+        await stream.emit(session_id, EVENT_ERROR, message=f"Checkout failed: {exc}")
+        return {"error": f"Checkout failed: {exc}"}
 
-    return complete_node
+
+async def _complete_node(
+    state: ShoppingGraphState,
+    *,
+    stream: ShoppingEventStream,
+) -> ShoppingGraphState:
+    """Emit the final completion event."""
+    session_id = state.get("session_id", "")
+    orders = state.get("completed_orders", [])
+
+    await stream.emit(
+        session_id,
+        EVENT_COMPLETED,
+        data={
+            "order_count": len(orders),
+            "orders": orders,
+        },
+        message=f"Shopping complete! {len(orders)} order(s) placed.",
+    )
+    return {
+        "current_state": ShoppingSessionState.COMPLETED,
+    }
 
 
 async def _fail_node(state: ShoppingGraphState) -> ShoppingGraphState:
     """Terminal failure node."""
     return {
-        **state,
         "current_state": ShoppingSessionState.FAILED,
     }
 
@@ -418,14 +430,6 @@ def _after_discover(state: ShoppingGraphState) -> str:
     return "fail"
 
 
-def _after_compare(state: ShoppingGraphState) -> str:
-    """Route after comparison: optimize if multi-item, else present."""
-    matrix = state.get("comparison_matrix")
-    if matrix and len(matrix.entries) > 1:
-        return "optimize"
-    return "optimize"  # Always optimize even for single items for consistency
-
-
 def _after_wait(state: ShoppingGraphState) -> str:
     """Route after human confirmation gate."""
     if state.get("user_confirmed", False):
@@ -441,6 +445,7 @@ def _after_wait(state: ShoppingGraphState) -> str:
 def build_shopping_graph(
     settings: Settings,
     stream: ShoppingEventStream,
+    client: UCPClient | None = None,
 ) -> StateGraph:
     """Construct the LangGraph shopping workflow.
 
@@ -450,6 +455,10 @@ def build_shopping_graph(
         Application settings.
     stream:
         SSE event stream for real-time updates.
+    client:
+        UCP client whose connection pool is shared by the discovery, search
+        and checkout agents.  The caller owns it and is responsible for
+        closing it; a private one is created when omitted.
 
     Returns
     -------
@@ -457,26 +466,29 @@ def build_shopping_graph(
         An uncompiled graph.  Call ``.compile()`` before invoking.
     """
     # Instantiate agents
+    client = client or UCPClient()
     planner = ShoppingPlanner(settings)
-    discovery = DiscoveryAgent(settings)
-    search_agent = SearchAgent(settings)
+    discovery = DiscoveryAgent(settings, client)
+    search_agent = SearchAgent(settings, client)
     comparison = ComparisonAgent()
     optimizer = SplitOrderOptimizer()
-    checkout_agent = CheckoutAgent(settings)
+    checkout_agent = CheckoutAgent(settings, client)
 
     # Build graph
     graph = StateGraph(ShoppingGraphState)
 
     # Add nodes
-    graph.add_node("plan", _make_plan_node(planner, stream))
-    graph.add_node("discover", _make_discover_node(discovery, stream))
-    graph.add_node("search", _make_search_node(search_agent, stream))
-    graph.add_node("compare", _make_compare_node(comparison, stream))
-    graph.add_node("optimize", _make_optimize_node(optimizer, stream))
-    graph.add_node("present", _make_present_node(stream))
-    graph.add_node("wait_for_confirmation", _make_wait_node(stream))
-    graph.add_node("checkout", _make_checkout_node(checkout_agent, stream))
-    graph.add_node("complete", _make_complete_node(stream))
+    graph.add_node("plan", partial(_plan_node, planner=planner, stream=stream))
+    graph.add_node("discover", partial(_discover_node, discovery=discovery, stream=stream))
+    graph.add_node("search", partial(_search_node, search_agent=search_agent, stream=stream))
+    graph.add_node("compare", partial(_compare_node, comparison=comparison, stream=stream))
+    graph.add_node("optimize", partial(_optimize_node, optimizer=optimizer, stream=stream))
+    graph.add_node("present", partial(_present_node, stream=stream))
+    graph.add_node("wait_for_confirmation", partial(_wait_node, stream=stream))
+    graph.add_node(
+        "checkout", partial(_checkout_node, checkout_agent=checkout_agent, stream=stream)
+    )
+    graph.add_node("complete", partial(_complete_node, stream=stream))
     graph.add_node("fail", _fail_node)
 
     # Entry point
@@ -492,13 +504,7 @@ def build_shopping_graph(
     )
 
     graph.add_edge("search", "compare")
-
-    graph.add_conditional_edges(
-        "compare",
-        _after_compare,
-        {"optimize": "optimize", "present": "present"},
-    )
-
+    graph.add_edge("compare", "optimize")
     graph.add_edge("optimize", "present")
     graph.add_edge("present", "wait_for_confirmation")
 
@@ -517,10 +523,22 @@ def build_shopping_graph(
     return graph
 
 
+def _warm_validators() -> None:
+    """Build the schemas the search and compare nodes validate against.
+
+    Models defer their schema build to first use; these are on every
+    run's hot path, so build them with the graph instead.
+    """
+    ProductResult.model_rebuild()
+    ComparisonMatrix.model_rebuild()
+
+
 def compile_shopping_graph(
     settings: Settings,
     stream: ShoppingEventStream,
+    client: UCPClient | None = None,
 ):
     """Build and compile the shopping graph into a runnable."""
-    graph = build_shopping_graph(settings, stream)
+    _warm_validators()
+    graph = build_shopping_graph(settings, stream, client)
     return graph.compile()
@@ -6,7 +6,8 @@ through the graph.  Nodes read from and write to this shared state.
 
 from __future__ import annotations
 
-from typing import Any, TypedDict
+import operator
+from typing import Annotated, Any, TypedDict
 
 from ucp_shopping.models import (
     CheckoutStatus,
@@ -35,9 +36,11 @@ class ShoppingGraphState(TypedDict, total=False):
 
     # --- Planning -------------------------------------------------------------
     shopping_plan: ShoppingPlan | None
+    search_queries: list[str]  # one per plan item, built with the plan
 
     # --- Merchant discovery ---------------------------------------------------
     discovered_merchants: list[MerchantInfo]
+    merchants_map: dict[str, MerchantInfo]  # discovered merchants by id
     failed_merchants: list[str]
 
     # --- Product search -------------------------------------------------------
@@ -61,4 +64,5 @@ class ShoppingGraphState(TypedDict, total=False):
     error: str | None
 
     # --- Message log (for debugging / LLM context) ----------------------------
-    messages: list[dict[str, Any]]
+    # Nodes return only new messages; the reducer appends them.
+    messages: Annotated[list[dict[str, Any]], operator.add]
@@ -6,14 +6,20 @@ be discovered and invoked by LLM tool-use or MCP clients.
 
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 import structlog
+from pydantic import TypeAdapter
 
-from ucp_shopping.models import MCPToolDefinition, MCPToolResult
+from ucp_shopping.models import MCPToolDefinition, MCPToolResult, OrderSummary
 
 logger = structlog.get_logger(__name__)
 
+# List dumps run in one pydantic-core call rather than one per model
+_TOOLS_ADAPTER: TypeAdapter[list[MCPToolDefinition]] = TypeAdapter(list[MCPToolDefinition])
+_ORDERS_ADAPTER: TypeAdapter[list[OrderSummary]] = TypeAdapter(list[OrderSummary])
+
 
 # ---------------------------------------------------------------------------
 # Tool definitions
@@ -145,7 +151,7 @@ SHOPPING_TOOLS: list[MCPToolDefinition] = [
 
 def list_tools() -> list[dict[str, Any]]:
     """Return all MCP tool definitions as dicts."""
-    return [tool.model_dump() for tool in SHOPPING_TOOLS]
+    return _TOOLS_ADAPTER.dump_python(SHOPPING_TOOLS)
 
 
 # ---------------------------------------------------------------------------
@@ -162,6 +168,11 @@ class MCPToolHandler:
 
     def __init__(self, app_state: Any) -> None:
         self._state = app_state
+        # Tool name -> bound handler, resolved once.  Every tool in
+        # SHOPPING_TOOLS must have a matching ``_handle_<name>`` method.
+        self._dispatch: dict[str, Callable[[dict[str, Any]], Awaitable[dict[str, Any]]]] = {
+            tool.name: getattr(self, f"_handle_{tool.name}") for tool in SHOPPING_TOOLS
+        }
 
     async def execute(self, tool_name: str, arguments: dict[str, Any]) -> MCPToolResult:
         """Execute the named tool with the provided arguments.
@@ -178,16 +189,7 @@ class MCPToolHandler:
         MCPToolResult
             Execution result.
         """
-        handler_map = {
-            "shop": self._handle_shop,
-            "compare_prices": self._handle_compare_prices,
-            "find_best_deal": self._handle_find_best_deal,
-            "discover_merchants": self._handle_discover_merchants,
-            "track_orders": self._handle_track_orders,
-            "get_shopping_status": self._handle_get_shopping_status,
-        }
-
-        handler = handler_map.get(tool_name)
+        handler = self._dispatch.get(tool_name)
         if handler is None:
             return MCPToolResult(
                 tool_name=tool_name,
@@ -240,22 +242,16 @@ class MCPToolHandler:
 
     async def _handle_compare_prices(self, arguments: dict[str, Any]) -> dict[str, Any]:
         """Handle the ``compare_prices`` tool."""
-        from ucp_shopping.agents.comparison_agent import ComparisonAgent
-        from ucp_shopping.agents.discovery_agent import DiscoveryAgent
-        from ucp_shopping.agents.search_agent import SearchAgent
-
         product_query = arguments["product_query"]
-        settings = self._state.settings
 
         # Quick discovery + search + compare pipeline
-        discovery = DiscoveryAgent(settings)
-        merchants = await discovery.discover_merchants()
-
-        search_agent = SearchAgent(settings)
-        results = await search_agent.search_all_merchants(merchants, [product_query])
-
-        comparison = ComparisonAgent()
-        matrix = await comparison.build_comparison(results, [product_query])
+        merchants = await self._state.discover_known_merchants()
+        results = await self._state.search_agent.search_all_merchants(
+            merchants, [product_query]
+        )
+        matrix = await self._state.comparison_agent.build_comparison(
+            results, [product_query]
+        )
 
         return {
             "query": product_query,
@@ -308,11 +304,8 @@ class MCPToolHandler:
 
     async def _handle_discover_merchants(self, arguments: dict[str, Any]) -> dict[str, Any]:
         """Handle the ``discover_merchants`` tool."""
-        from ucp_shopping.agents.discovery_agent import DiscoveryAgent
-
         urls = arguments["urls"]
-        discovery = DiscoveryAgent(self._state.settings)
-        merchants = await discovery.discover_merchants(urls)
+        merchants = await self._state.discovery_agent.discover_merchants(urls)
 
         return {
             "discovered": len(merchants),
@@ -334,7 +327,7 @@ class MCPToolHandler:
             return {"error": f"Order {order_id} not found"}
 
         return {
-            "orders": [o.model_dump() for o in orders.values()],
+            "orders": _ORDERS_ADAPTER.dump_python(list(orders.values())),
             "total": len(orders),
         }
 
@@ -342,7 +335,7 @@ class MCPToolHandler:
         """Handle the ``get_shopping_status`` tool."""
         session_id = arguments["session_id"]
         session_mgr = self._state.session_manager
-        session = session_mgr.get_session(session_id)
+        session = await session_mgr.get_session(session_id)
 
         if session is None:
             return {"error": f"Session {session_id} not found"}
@@ -6,6 +6,7 @@ search, and the full checkout lifecycle.
 
 from __future__ import annotations
 
+import importlib.util
 from typing import Any
 
 import httpx
@@ -18,6 +19,12 @@ logger = structlog.get_logger(__name__)
 _DEFAULT_TIMEOUT = 15.0
 _MAX_RETRIES = 2
 
+# One pool serves every agent's fan-out (see ``with_timeout``), so size it
+# for many concurrent merchant requests and keep connections warm.
+_POOL_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+# HTTP/2 multiplexing needs the optional ``h2`` package (``pip install .[http2]``)
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
 
 class UCPClientError(Exception):
     """Raised when a UCP request fails after retries."""
@@ -34,18 +41,36 @@ class UCPClient:
         self._timeout = timeout
         self._max_retries = max_retries
         self._client: httpx.AsyncClient | None = None
+        # Set on views created by ``with_timeout``; the owner holds the pool.
+        self._owner: UCPClient | None = None
+
+    def with_timeout(self, timeout: float) -> UCPClient:
+        """Return a client that shares this connection pool with its own timeout.
+
+        Closing the returned view is a no-op; the pool is released when the
+        owning client is closed.
+        """
+        view = UCPClient(timeout=timeout, max_retries=self._max_retries)
+        view._owner = self._owner or self
+        return view
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Lazy-initialise the shared ``httpx.AsyncClient``."""
+        if self._owner is not None:
+            return await self._owner._get_client()
         if self._client is None or self._client.is_closed:
             self._client = httpx.AsyncClient(
                 timeout=httpx.Timeout(self._timeout),
+                limits=_POOL_LIMITS,
+                http2=_HTTP2_AVAILABLE,
                 follow_redirects=True,
             )
         return self._client
 
     async def close(self) -> None:
         """Shut down the underlying HTTP client."""
+        if self._owner is not None:
+            return
         if self._client and not self._client.is_closed:
             await self._client.aclose()
 
@@ -71,6 +96,7 @@ class UCPClient:
                     url,
                     json=json_body,
                     params=params,
+                    timeout=self._timeout,
                 )
                 response.raise_for_status()
                 return response.json()
@@ -214,58 +240,124 @@ class UCPClient:
         """
         url = f"{merchant_url.rstrip('/')}/api/v1/catalog/products"
         params: dict[str, Any] = {"q": query, "limit": limit}
-        if filters:
-            if "category" in filters:
-                params["category"] = filters["category"]
-            if "min_price" in filters:
-                params["min_price"] = filters["min_price"]
-            if "max_price" in filters:
-                params["max_price"] = filters["max_price"]
+        params.update(self._search_filters(filters))
 
         data = await self._request("GET", url, params=params)
-        products_data = data.get("products", [])
-
-        results: list[ProductResult] = []
-        for p in products_data:
-            # Parse shipping options
-            shipping_options: list[ShippingOption] = []
-            for so in p.get("shipping_options", []):
-                shipping_options.append(
-                    ShippingOption(
-                        id=so.get("id", "standard"),
-                        name=so.get("name", "Standard"),
-                        price=so.get("price", 5.99),
-                        estimated_days_min=so.get("estimated_days_min", 3),
-                        estimated_days_max=so.get("estimated_days_max", 7),
-                        is_free=so.get("is_free", False),
-                    )
-                )
+        default_shipping = self._parse_shipping_options(data.get("shipping_options", []))
+        return [
+            self._parse_product(p, default_shipping) for p in data.get("products", [])
+        ]
 
-            # Parse price (could be nested Money object or flat)
-            price_val = p.get("price", 0)
-            if isinstance(price_val, dict):
-                price_val = price_val.get("amount", 0)
-
-            results.append(
-                ProductResult(
-                    product_id=p.get("id", ""),
-                    name=p.get("name", ""),
-                    description=p.get("description", ""),
-                    price=float(price_val),
-                    merchant_id=p.get("merchant_id", ""),
-                    merchant_name=p.get("merchant_name", ""),
-                    category=p.get("category", ""),
-                    brand=p.get("brand", ""),
-                    shipping_options=shipping_options,
-                    in_stock=p.get("in_stock", p.get("stock", 0) > 0),
-                    stock_quantity=p.get("stock", 0),
-                    url=p.get("url", ""),
-                    specs=p.get("specs", {}),
-                    rating=p.get("rating", 0.0),
-                )
+    async def search_products_batch(
+        self,
+        merchant_url: str,
+        queries: list[str],
+        filters: dict[str, Any] | None = None,
+        limit: int = 20,
+    ) -> list[list[ProductResult]]:
+        """Run several catalog searches against one merchant in a single request.
+
+        Requires the merchant to advertise the ``catalog.search.batch``
+        capability.
+
+        Parameters
+        ----------
+        merchant_url:
+            Base URL of the merchant.
+        queries:
+            Free-text search queries.
+        filters:
+            Optional filters (category, brand, price range) applied to
+            every query.
+        limit:
+            Max results to return per query.
+
+        Returns
+        -------
+        list[list[ProductResult]]
+            Products matching each query, in the order of *queries*.
+        """
+        url = f"{merchant_url.rstrip('/')}/api/v1/catalog/search"
+        body: dict[str, Any] = {"queries": queries, "limit": limit}
+        body.update(self._search_filters(filters))
+
+        data = await self._request("POST", url, json_body=body)
+        results = data.get("results", [])
+        if len(results) != len(queries):
+            raise UCPClientError(
+                f"Batch search at {merchant_url} returned {len(results)} result sets "
+                f"for {len(queries)} queries"
             )
+        default_shipping = self._parse_shipping_options(data.get("shipping_options", []))
+        return [
+            [self._parse_product(p, default_shipping) for p in result.get("products", [])]
+            for result in results
+        ]
 
-        return results
+    @staticmethod
+    def _search_filters(filters: dict[str, Any] | None) -> dict[str, Any]:
+        """Select the catalog filters understood by UCP search endpoints."""
+        if not filters:
+            return {}
+        return {
+            key: filters[key]
+            for key in ("category", "min_price", "max_price")
+            if key in filters
+        }
+
+    @staticmethod
+    def _parse_shipping_options(raw: list[dict[str, Any]]) -> list[ShippingOption]:
+        """Build ``ShippingOption`` objects from a UCP shipping payload."""
+        return [
+            ShippingOption(
+                id=so.get("id", "standard"),
+                name=so.get("name", "Standard"),
+                price=so.get("price", 5.99),
+                estimated_days_min=so.get("estimated_days_min", 3),
+                estimated_days_max=so.get("estimated_days_max", 7),
+                is_free=so.get("is_free", False),
+            )
+            for so in raw
+        ]
+
+    @classmethod
+    def _parse_product(
+        cls,
+        p: dict[str, Any],
+        default_shipping: list[ShippingOption] | None = None,
+    ) -> ProductResult:
+        """Build a ``ProductResult`` from a UCP catalog product payload.
+
+        Products without their own ``shipping_options`` use
+        *default_shipping*, the merchant-wide options sent once per search
+        response.
+        """
+        if "shipping_options" in p:
+            shipping_options = cls._parse_shipping_options(p["shipping_options"])
+        else:
+            shipping_options = default_shipping or []
+
+        # Parse price (could be nested Money object or flat)
+        price_val = p.get("price", 0)
+        if isinstance(price_val, dict):
+            price_val = price_val.get("amount", 0)
+
+        return ProductResult(
+            product_id=p.get("id", ""),
+            name=p.get("name", ""),
+            description=p.get("description", ""),
+            price=float(price_val),
+            merchant_id=p.get("merchant_id", ""),
+            merchant_name=p.get("merchant_name", ""),
+            category=p.get("category", ""),
+            brand=p.get("brand", ""),
+            shipping_options=shipping_options,
+            in_stock=p.get("in_stock", p.get("stock", 0) > 0),
+            stock_quantity=p.get("stock", 0),
+            url=p.get("url", ""),
+            specs=p.get("specs", {}),
+            rating=p.get("rating", 0.0),
+        )
 
     # ------------------------------------------------------------------
     # Checkout lifecycle
@@ -0,0 +1,123 @@
+"""Pluggable storage for shopping sessions.
+
+``InMemorySessionStore`` keeps sessions in a process-local dict (the default,
+suitable for development).  ``RedisSessionStore`` keeps them in Redis with
+a native TTL so sessions survive restarts.  Either way the app runs as a
+single worker: graph runs and SSE streams are not shared between processes.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Protocol
+
+import structlog
+
+from ucp_shopping.config import Settings
+from ucp_shopping.models import ShoppingSession
+
+logger = structlog.get_logger(__name__)
+
+_REDIS_KEY_PREFIX = "ucp-shopping:session:"
+
+
+class SessionStore(Protocol):
+    """Async key-value store for :class:`ShoppingSession` objects."""
+
+    async def get(self, session_id: str) -> ShoppingSession | None:
+        """Return the session, or ``None`` if it does not exist (or expired)."""
+        ...
+
+    async def set(self, session: ShoppingSession) -> None:
+        """Insert or replace a session."""
+        ...
+
+    async def delete(self, session_id: str) -> None:
+        """Remove a session if present."""
+        ...
+
+    async def scan(self) -> list[ShoppingSession]:
+        """Return all live sessions."""
+        ...
+
+    async def close(self) -> None:
+        """Release any connections held by the store."""
+        ...
+
+
+class InMemorySessionStore:
+    """Process-local session store backed by a dict."""
+
+    def __init__(self) -> None:
+        self._sessions: dict[str, ShoppingSession] = {}
+
+    async def get(self, session_id: str) -> ShoppingSession | None:
+        return self._sessions.get(session_id)
+
+    async def set(self, session: ShoppingSession) -> None:
+        self._sessions[session.id] = session
+
+    async def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    async def scan(self) -> list[ShoppingSession]:
+        return list(self._sessions.values())
+
+    async def close(self) -> None:
+        return None
+
+
+class RedisSessionStore:
+    """Redis-backed session store; every write refreshes the session TTL.
+
+    Requires the optional ``redis`` package (``pip install .[redis]``).
+
+    Parameters
+    ----------
+    url:
+        Redis connection URL.
+    ttl_seconds:
+        Expiry applied to each session key on write.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int) -> None:
+        from redis.asyncio import Redis
+
+        self._redis: Any = Redis.from_url(url)
+        self._ttl_seconds = ttl_seconds
+
+    async def get(self, session_id: str) -> ShoppingSession | None:
+        raw = await self._redis.get(_REDIS_KEY_PREFIX + session_id)
+        if raw is None:
+            return None
+        return ShoppingSession.model_validate_json(raw)
+
+    async def set(self, session: ShoppingSession) -> None:
+        await self._redis.set(
+            _REDIS_KEY_PREFIX + session.id,
+            session.model_dump_json(),
+            ex=self._ttl_seconds,
+        )
+
+    async def delete(self, session_id: str) -> None:
+        await self._redis.delete(_REDIS_KEY_PREFIX + session_id)
+
+    async def scan(self) -> list[ShoppingSession]:
+        keys = [key async for key in self._redis.scan_iter(match=_REDIS_KEY_PREFIX + "*")]
+        if not keys:
+            return []
+        return [
+            ShoppingSession.model_validate_json(raw)
+            for raw in await self._redis.mget(keys)
+            if raw is not None
+        ]
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_session_store(settings: Settings) -> SessionStore:
+    """Build the session store selected by ``settings.session_backend``."""
+    if settings.session_backend == "redis":
+        logger.info("session_store_selected", backend="redis")
+        return RedisSessionStore(settings.redis_url, settings.session_ttl_seconds)
+    return InMemorySessionStore()
@@ -36,13 +36,16 @@ class ShoppingEventStream:
     """In-memory pub/sub for shopping session SSE events.
 
     Each shopping session gets its own ``asyncio.Queue`` so that multiple
-    SSE subscribers can consume events independently.
+    SSE subscribers can consume events independently.  Queues are bounded:
+    a subscriber that falls *max_queue_size* events behind is disconnected
+    rather than buffered, and can reconnect to replay the session history.
     """
 
     def __init__(self, max_queue_size: int = 256) -> None:
         self._queues: dict[str, list[asyncio.Queue[ShoppingEvent | None]]] = {}
         self._max_queue_size = max_queue_size
         self._history: dict[str, list[ShoppingEvent]] = {}
+        self._pending: dict[str, list[ShoppingEvent]] = {}
 
     # ------------------------------------------------------------------
     # Publishing
@@ -57,9 +60,45 @@ class ShoppingEventStream:
     ) -> ShoppingEvent:
         """Push an event to all subscribers of *session_id*.
 
+        Any events buffered with :meth:`emit_buffered` for the session are
+        delivered first, so ordering is preserved.
+
         Returns the constructed :class:`ShoppingEvent` for convenience.
         """
-        event = ShoppingEvent(
+        self.flush(session_id)
+        event = self._build_event(session_id, event_type, data, message)
+        self._publish(event)
+        return event
+
+    def emit_buffered(
+        self,
+        session_id: str,
+        event_type: str,
+        data: dict[str, Any] | None = None,
+        message: str = "",
+    ) -> ShoppingEvent:
+        """Record an event for *session_id* without waking subscribers.
+
+        Intended for intermediate progress events: they are delivered
+        together by the next :meth:`flush` or :meth:`emit` for the session.
+        """
+        event = self._build_event(session_id, event_type, data, message)
+        self._pending.setdefault(session_id, []).append(event)
+        return event
+
+    def flush(self, session_id: str) -> None:
+        """Deliver all buffered events for *session_id* in emission order."""
+        for event in self._pending.pop(session_id, ()):
+            self._publish(event)
+
+    @staticmethod
+    def _build_event(
+        session_id: str,
+        event_type: str,
+        data: dict[str, Any] | None,
+        message: str,
+    ) -> ShoppingEvent:
+        return ShoppingEvent(
             event_type=event_type,
             session_id=session_id,
             data=data or {},
@@ -67,28 +106,33 @@ class ShoppingEventStream:
             timestamp=datetime.now(tz=timezone.utc),
         )
 
+    def _publish(self, event: ShoppingEvent) -> None:
+        """Record *event* in history and fan it out to live subscribers."""
+        session_id = event.session_id
+
         # Persist in history
         self._history.setdefault(session_id, []).append(event)
 
         # Fan-out to all live subscriber queues
         queues = self._queues.get(session_id, [])
-        for queue in queues:
+        for queue in list(queues):
             try:
                 queue.put_nowait(event)
             except asyncio.QueueFull:
+                queues.remove(queue)
+                self._disconnect(queue)
                 logger.warning(
-                    "event_queue_full",
+                    "event_subscriber_dropped",
                     session_id=session_id,
-                    event_type=event_type,
+                    event_type=event.event_type,
                 )
 
         logger.debug(
             "event_emitted",
             session_id=session_id,
-            event_type=event_type,
+            event_type=event.event_type,
             subscribers=len(queues),
         )
-        return event
 
     # ------------------------------------------------------------------
     # Subscribing
@@ -101,23 +145,47 @@ class ShoppingEventStream:
         ``error`` event, or when ``close(session_id)`` is called (which
         pushes ``None`` as a sentinel).
         """
+        async for batch in self.subscribe_batches(session_id):
+            for event in batch:
+                yield event
+
+    async def subscribe_batches(
+        self, session_id: str
+    ) -> AsyncIterator[list[ShoppingEvent]]:
+        """Yield events for *session_id* in batches, in emission order.
+
+        Each batch holds the next event plus everything already queued
+        behind it, so a burst (e.g. a :meth:`flush` of buffered progress
+        events) reaches the consumer in one step without waiting for
+        more.  Terminates like :meth:`subscribe`.
+        """
         queue: asyncio.Queue[ShoppingEvent | None] = asyncio.Queue(
             maxsize=self._max_queue_size
         )
         self._queues.setdefault(session_id, []).append(queue)
 
-        # Replay any historical events first so late joiners catch up
-        for past_event in self._history.get(session_id, []):
-            yield past_event
-
         try:
+            # Replay any historical events first so late joiners (and
+            # reconnecting subscribers) catch up
+            history = self._history.get(session_id)
+            if history:
+                yield list(history)
+                if history[-1].event_type in (EVENT_COMPLETED, EVENT_ERROR):
+                    return
+
             while True:
+                batch: list[ShoppingEvent] = []
                 event = await queue.get()
-                if event is None:
-                    # Sentinel: stream closed
-                    break
-                yield event
-                if event.event_type in (EVENT_COMPLETED, EVENT_ERROR):
+                while event is not None:
+                    batch.append(event)
+                    if event.event_type in (EVENT_COMPLETED, EVENT_ERROR):
+                        break
+                    if queue.empty():
+                        break
+                    event = queue.get_nowait()
+                if batch:
+                    yield batch
+                if event is None or event.event_type in (EVENT_COMPLETED, EVENT_ERROR):
                     break
         finally:
             # Clean up this subscriber
@@ -130,13 +198,25 @@ class ShoppingEventStream:
     # ------------------------------------------------------------------
 
     def close(self, session_id: str) -> None:
-        """Signal all subscribers of *session_id* to stop iterating."""
-        for queue in self._queues.get(session_id, []):
+        """Signal all subscribers of *session_id* to stop iterating.
+
+        Buffered events are flushed first, and the close sentinel queues up
+        behind them, so subscribers still see every event.  Only a
+        subscriber whose queue is already full loses its backlog.
+        """
+        self.flush(session_id)
+        for queue in self._queues.pop(session_id, []):
             try:
                 queue.put_nowait(None)
             except asyncio.QueueFull:
-                pass
-        self._queues.pop(session_id, None)
+                self._disconnect(queue)
+
+    @staticmethod
+    def _disconnect(queue: asyncio.Queue[ShoppingEvent | None]) -> None:
+        """Discard a lagging subscriber's backlog and push the close sentinel."""
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
 
     def get_history(self, session_id: str) -> list[ShoppingEvent]:
         """Return all events emitted for a given session."""
@@ -1,10 +1,46 @@
 """Tests for UCP Shopping Agent API."""
 
+import asyncio
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from ucp_shopping.agents.checkout_agent import CheckoutAgent
 from ucp_shopping.main import build_app
 from ucp_shopping.config import Settings
+from ucp_shopping.models import MerchantInfo, SplitOrderItem, SplitOrderPlan
+from ucp_shopping.streaming import (
+    EVENT_CHECKOUT_PROGRESS,
+    EVENT_COMPLETED,
+    ShoppingEventStream,
+)
+
+
+async def _collect(stream, session_id, received):
+    async for event in stream.subscribe(session_id):
+        received.append(event.message)
+
+
+class _StalledCheckoutClient:
+    """UCP client stand-in whose checkouts hang at the completion step."""
+
+    def __init__(self):
+        self.completing = asyncio.Event()
+        self.release = asyncio.Event()
+
+    def with_timeout(self, timeout):
+        return self
+
+    async def create_checkout(self, merchant_url, line_items):
+        return {"id": "cs-1"}
+
+    async def update_checkout(self, merchant_url, checkout_id, payload):
+        return {"id": checkout_id}
+
+    async def complete_checkout(self, merchant_url, checkout_id):
+        self.completing.set()
+        await self.release.wait()
+        return {"order_id": "ORD-1"}
 
 
 @pytest.fixture
@@ -72,6 +108,23 @@ class TestMockMerchants:
             )
             assert resp.status_code == 200
 
+    async def test_batch_search_matches_single_searches(self, client):
+        queries = ["keyboard", "usb hub"]
+        resp = await client.post(
+            "/merchants/techzone/api/v1/catalog/search",
+            json={"queries": queries, "limit": 5},
+        )
+        assert resp.status_code == 200
+        results = resp.json()["results"]
+        assert len(results) == len(queries)
+        for q, result in zip(queries, results):
+            single = await client.get(
+                "/merchants/techzone/api/v1/catalog/products",
+                params={"q": q, "limit": 5},
+            )
+            assert result["products"] == single.json()["products"]
+            assert result["total"] == single.json()["total"]
+
     async def test_techzone_negotiate(self, client):
         resp = await client.post(
             "/merchants/techzone/api/v1/negotiate",
@@ -126,6 +179,12 @@ class TestMockMerchants:
         assert data["state"] == "completed"
         assert "order_id" in data
 
+        # Tracking URL points at the order's own tracking number
+        resp = await client.get(f"/merchants/techzone/api/v1/orders/{data['order_id']}")
+        assert resp.status_code == 200
+        order = resp.json()
+        assert order["tracking_url"].endswith(order["tracking_number"])
+
 
 class TestMerchantDiscovery:
     async def test_list_merchants(self, client):
@@ -181,6 +240,95 @@ class TestShopping:
         resp = await client.get("/api/v1/shop/nonexistent-id")
         assert resp.status_code == 404
 
+    async def test_sweep_evicts_expired_sessions(self):
+        app = build_app(Settings(
+            environment="testing",
+            openai_api_key="test-key",
+            session_ttl_seconds=0,
+        ))
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as c:
+            create_resp = await c.post("/api/v1/shop", json={"query": "mouse"})
+            session_id = create_resp.json()["session_id"]
+
+            await app.state.app_state.sweep_expired()
+
+            resp = await c.get(f"/api/v1/shop/{session_id}")
+            assert resp.status_code == 404
+
+
+class TestEventStream:
+    async def test_close_delivers_buffered_events(self):
+        stream = ShoppingEventStream()
+        received: list[str] = []
+        consumer = asyncio.create_task(_collect(stream, "s1", received))
+        await asyncio.sleep(0)
+
+        stream.emit_buffered("s1", EVENT_CHECKOUT_PROGRESS, message="creating")
+        stream.emit_buffered("s1", EVENT_CHECKOUT_PROGRESS, message="updating")
+        stream.close("s1")
+
+        await asyncio.wait_for(consumer, timeout=1)
+        assert received == ["creating", "updating"]
+
+    async def test_lagging_subscriber_is_disconnected_and_replays(self):
+        stream = ShoppingEventStream(max_queue_size=2)
+        received: list[str] = []
+        consumer = asyncio.create_task(_collect(stream, "s1", received))
+        await asyncio.sleep(0)
+
+        for step in ("one", "two", "three"):
+            await stream.emit("s1", EVENT_CHECKOUT_PROGRESS, message=step)
+
+        # Overflowing the queue ends the stream instead of skipping events
+        await asyncio.wait_for(consumer, timeout=1)
+        assert received == []
+
+        # Reconnecting replays the full history
+        await stream.emit("s1", EVENT_COMPLETED, message="done")
+        replayed: list[str] = []
+        await asyncio.wait_for(_collect(stream, "s1", replayed), timeout=1)
+        assert replayed == ["one", "two", "three", "done"]
+
+
+    async def test_cancelled_checkout_delivers_buffered_steps(self, settings):
+        stream = ShoppingEventStream()
+        client = _StalledCheckoutClient()
+        agent = CheckoutAgent(settings, client=client)
+        plan = SplitOrderPlan(items=[
+            SplitOrderItem(
+                product_name="Keyboard",
+                product_id="tz-kb-001",
+                merchant_name="TechZone",
+                merchant_id="techzone",
+                price=89.99,
+                shipping_cost=5.99,
+            ),
+        ])
+        merchants = {
+            "techzone": MerchantInfo(id="techzone", name="TechZone", url="http://tz"),
+        }
+        received: list[str] = []
+        consumer = asyncio.create_task(_collect(stream, "s1", received))
+        await asyncio.sleep(0)
+
+        checkout = asyncio.create_task(
+            agent.execute_checkouts(plan, merchants, stream=stream, session_id="s1")
+        )
+        await asyncio.wait_for(client.completing.wait(), timeout=1)
+
+        # What /cancel does: stop the run, then close the stream
+        checkout.cancel()
+        stream.close("s1")
+        await asyncio.wait_for(consumer, timeout=1)
+        client.release.set()
+
+        assert received == [
+            "Creating checkout at TechZone...",
+            "Setting shipping details at TechZone...",
+            "Completing order at TechZone...",
+        ]
+
 
 class TestOrders:
     async def test_list_orders(self, client):
@@ -121,6 +121,36 @@ class TestComparisonAgent:
         # MegaMart at $69.99 should be cheapest for keyboard
         assert entry.best_price.price == 69.99
 
+    async def test_shared_product_scored_per_entry(self, sample_search_results):
+        agent = ComparisonAgent()
+        alone = await agent.build_comparison(
+            sample_search_results,
+            item_names=["keyboard"],
+        )
+        expected = {p.product_id: p.score for p in alone.entries[0].merchant_results}
+
+        # "pro" re-ranks tz-kb-001 against a different candidate set
+        matrix = await agent.build_comparison(
+            sample_search_results,
+            item_names=["keyboard", "pro"],
+        )
+        scores = {p.product_id: p.score for p in matrix.entries[0].merchant_results}
+        assert scores == expected
+        assert "tz-kb-001" in {p.product_id for p in matrix.entries[1].merchant_results}
+
+    async def test_search_results_left_unscored(self, sample_search_results):
+        agent = ComparisonAgent()
+        matrix = await agent.build_comparison(
+            sample_search_results,
+            item_names=["keyboard", "usb hub"],
+        )
+        assert all(p.score > 0 for e in matrix.entries for p in e.merchant_results)
+        assert all(
+            p.score == 0.0
+            for products in sample_search_results.values()
+            for p in products
+        )
+
     async def test_empty_results(self):
         agent = ComparisonAgent()
         matrix = await agent.build_comparison({}, item_names=["nothing"])
@@ -152,6 +182,37 @@ class TestSplitOrderOptimizer:
         # savings_vs_single should be >= 0
         assert plan.savings_vs_single >= 0
 
+    async def test_single_merchant_plan_reports_shipping_savings(self):
+        # The baseline takes the lowest-priced keyboard; the plan picks the
+        # one that is cheaper once shipping is included
+        search_results = {
+            "techzone": [
+                ProductResult(
+                    product_id="tz-kb-001",
+                    name="Mechanical Keyboard",
+                    price=50.00,
+                    merchant_id="techzone",
+                    merchant_name="TechZone",
+                    shipping_options=[ShippingOption(price=20.00)],
+                ),
+                ProductResult(
+                    product_id="tz-kb-002",
+                    name="Mechanical Keyboard Plus",
+                    price=52.00,
+                    merchant_id="techzone",
+                    merchant_name="TechZone",
+                    shipping_options=[ShippingOption(price=0.00, is_free=True)],
+                ),
+            ],
+        }
+        matrix = await ComparisonAgent().build_comparison(
+            search_results, item_names=["keyboard"]
+        )
+        plan = await SplitOrderOptimizer().optimize(matrix, ShoppingPreferences())
+        assert plan.merchants_used == 1
+        assert plan.items[0].product_id == "tz-kb-002"
+        assert plan.savings_vs_single == 18.00
+
     async def test_prefer_single_merchant(self, sample_search_results):
         optimizer = SplitOrderOptimizer()
         agent = ComparisonAgent()